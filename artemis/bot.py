@@ -22,7 +22,7 @@ from . import utils
 from .utils.api import API
 from .utils.catbox import Catbox, Litterbox
 from .utils.deepl import DeepL
-from .utils.common import read_json, ArtemisError
+from .utils.common import aread_text, read_json, ArtemisError
 from .utils.constants import TEMP_DIR
 from .utils import config
 
@@ -76,6 +76,7 @@ class Artemis(commands.Bot):
         self.user_agent: str = config.user_agent
         self.real_user_agent: str = config.real_user_agent
         self.secrets = config.secrets
+        self.host_sessions: dict[str, aiohttp.ClientSession] = {}
 
         self.pink = discord.Colour(0xFFCFF1)
         self.invisible = discord.Colour(0x2F3136)
@@ -83,7 +84,7 @@ class Artemis(commands.Bot):
     async def maybe_send_restarted(self):
         restart = TEMP_DIR / "restart"
         if restart.exists():
-            chid, _, mid = restart.read_text().partition("-")
+            chid, _, mid = (await aread_text(restart)).partition("-")
             restart.unlink()
 
             with contextlib.suppress(Exception):
@@ -96,7 +97,10 @@ class Artemis(commands.Bot):
         from aiocache import Cache
 
         self.cache = Cache(Cache.MEMORY)
-        self.session = aiohttp.ClientSession()
+        connector = aiohttp.TCPConnector(
+            limit=100, limit_per_host=10, ttl_dns_cache=300, keepalive_timeout=75
+        )
+        self.session = aiohttp.ClientSession(connector=connector)
         self.httpx_session = httpx.AsyncClient(
             http2=True, follow_redirects=True, timeout=httpx.Timeout(60 * 3)
         )
@@ -120,8 +124,18 @@ class Artemis(commands.Bot):
         for extension in EXTENSIONS:
             await self.load_extension(extension)
 
+    def session_for(self, host: str) -> aiohttp.ClientSession:
+        """Returns a session with a keep-alive pool of its own for a frequently visited host."""
+        session = self.host_sessions.get(host)
+        if not session or session.closed:
+            connector = aiohttp.TCPConnector(limit=20, ttl_dns_cache=600, keepalive_timeout=120)
+            session = self.host_sessions[host] = aiohttp.ClientSession(connector=connector)
+        return session
+
     async def close(self):
         await self.session.close()
+        for session in self.host_sessions.values():
+            await session.close()
         await self.httpx_session.aclose()
         if hasattr(self, "db"):
             await self.db.close()
@@ -261,6 +275,11 @@ async def main():
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        from uvloop import run
+    except ImportError:
+        run = asyncio.run
+
+    try:
+        run(main())
     except KeyboardInterrupt:
         print("SIGINT received, closing.")
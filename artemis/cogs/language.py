@@ -1,20 +1,27 @@
 from __future__ import annotations
 
 import asyncio
+import base64
 import re
+from datetime import datetime, timezone
 from io import BytesIO
 from typing import TYPE_CHECKING
-from urllib.parse import quote, quote_plus
+from urllib.parse import quote_from_bytes
 
+import aiohttp
 import discord
-import gtts
+import lxml.html
+import orjson
 import pendulum
+from aiocache import cached
 from aiogoogletrans import LANGUAGES as GT_LANGUAGES
 from aiogoogletrans import Translator
-from bs4 import BeautifulSoup, Tag
+from aiogoogletrans import urls as gt_urls
+from aiogoogletrans import utils as gt_utils
 from discord import app_commands
 from discord.ext import commands
 from discord.utils import format_dt
+from lxml import etree
 
 from .. import utils
 from ..utils import iso_639
@@ -35,14 +42,93 @@ if TYPE_CHECKING:
 
 # Mod aiogoogletrans
 GT_LANGUAGES.update(GT_LANGUAGES_EXTRAS)
-translator = Translator()
-translator.lock = asyncio.Lock()
+GT_LANGUAGES_TITLED = {code: name.title() for code, name in GT_LANGUAGES.items()}
 
-# Load toki pona data
-nimi = read_json("data/nimi.json")
 
-nimi_lookup = {entry["word"]: entry for entry in nimi}
-nimi_reverse_lookup = {entry["definition"]: entry for entry in nimi}
+class SessionTranslator(Translator):
+    """Translator reusing a shared session instead of opening one per request."""
+
+    session: aiohttp.ClientSession | None = None
+
+    async def _translate(self, text, dest, src):
+        if not self.session:
+            return await super()._translate(text, dest, src)
+
+        token = await self.token_acquirer.do(text)
+        params = gt_utils.build_params(query=text, src=src, dest=dest, token=token)
+        url = gt_urls.TRANSLATE.format(host=self._pick_service_url())
+
+        async with self.session.get(
+            url + "?" + params,
+            headers=self.headers,
+            proxy=self.proxy,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        ) as r:
+            text = await r.text()
+
+        return gt_utils.format_json(text)
+
+
+_translator: SessionTranslator | None = None
+
+
+def get_translator(session: aiohttp.ClientSession) -> SessionTranslator:
+    global _translator
+    if _translator is None:
+        _translator = SessionTranslator()
+        _translator.session = session
+    return _translator
+
+
+# thanks, Danny
+UD_REF_RE = re.compile(r"(\[(.+?)\])")
+
+# one definition per line, optionally numbered and terminated with semicolons
+SJP_DEF_RE = re.compile(r"^(?:\d+\.\s)?(.*?);*$", re.M)
+SJP_ROOT_XPATH = etree.XPath(
+    "(.//*[contains(concat(' ', normalize-space(@class), ' '), ' lc ')])[1]"
+)
+SJP_TD_XPATH = etree.XPath("(.//td)[1]")
+
+GTTS_AUDIO_RE = re.compile(rb'jQ1olc","\[\\"(.*)\\"]')
+
+JISHO_ICON = "https://i.imgur.com/SO4IGvY.png"
+JISHO_WORD_URL = "https://jisho.org/word/"
+JISHO_KANA_TAG = "Usually written using kana alone"
+JISHO_WIKI_POS = "Wikipedia definition"
+
+# Load toki pona data as parallel columns, extras hold the remaining per-entry fields
+nimi_words: list[str] = []
+nimi_definitions: list[str] = []
+nimi_extras: list[dict[str, str]] = []
+
+for entry in read_json("data/nimi.json"):
+    nimi_words.append(entry.pop("word"))
+    nimi_definitions.append(entry.pop("definition"))
+    nimi_extras.append(entry)
+
+nimi_lookup = {word: idx for idx, word in enumerate(nimi_words)}
+
+# definition token -> row indices, for single word English lookups
+nimi_token_index: dict[str, list[int]] = {}
+for idx, definition in enumerate(nimi_definitions):
+    for token in dict.fromkeys(re.findall(r"\w+", definition.lower())):
+        nimi_token_index.setdefault(token, []).append(idx)
+
+
+GT_ICON = "https://upload.wikimedia.org/wikipedia/commons/d/db/Google_Translate_Icon.png"
+GT_COLOUR = 0x4B8CF5
+DEEPL_ICON = "https://www.google.com/s2/favicons?domain=deepl.com&sz=64"
+DEEPL_COLOUR = 0x0F2B46
+
+
+def make_translation_embed(
+    provider: str, icon: str, colour: int, src: str, dest: str, translation: str
+) -> discord.Embed:
+    embed = discord.Embed(colour=colour)
+    embed.set_author(name=provider, icon_url=icon)
+    embed.add_field(name=f"From {src} to {dest}", value=translation)
+    return embed
 
 
 # Translation slash commands
@@ -74,12 +160,9 @@ async def deepl_slash(interaction: discord.Interaction[Artemis], message: discor
     display_dest = languages.get(result_dest) or result_dest
     translation = result.translation
 
-    embed = discord.Embed(colour=0x0F2B46)
-    embed.set_author(
-        name="DeepL",
-        icon_url="https://www.google.com/s2/favicons?domain=deepl.com&sz=64",
+    embed = make_translation_embed(
+        "DeepL", DEEPL_ICON, DEEPL_COLOUR, display_src, display_dest, translation
     )
-    embed.add_field(name=f"From {display_src} to {display_dest}", value=translation)
     if billed_characters:
         embed.set_footer(text=f"Billed characters: {billed_characters}")
     await interaction.followup.send(embed=embed, ephemeral=True)
@@ -88,27 +171,25 @@ async def deepl_slash(interaction: discord.Interaction[Artemis], message: discor
 @app_commands.context_menu(name="Translate (Google)")
 @app_commands.allowed_installs(guilds=False, users=True)
 @app_commands.allowed_contexts(guilds=True, dms=True, private_channels=True)
-async def gt_slash(interaction: discord.Interaction, message: discord.Message):
+async def gt_slash(interaction: discord.Interaction[Artemis], message: discord.Message):
     await interaction.response.defer(ephemeral=True)
 
     content = message.content
     if not content:
         return await interaction.followup.send("No text detected.", ephemeral=True)
 
-    async with translator.lock:
-        try:
-            result = await translator.translate(content, src="auto", dest="en")
-        except ValueError as err:
-            return await interaction.followup.send(f"Error: {err}", ephemeral=True)
+    try:
+        result = await get_translator(interaction.client.session).translate(
+            content, src="auto", dest="en"
+        )
+    except ValueError as err:
+        return await interaction.followup.send(f"Error: {err}", ephemeral=True)
 
-    src = GT_LANGUAGES[result.src.lower()].title()
+    src = GT_LANGUAGES_TITLED[result.src.lower()]
     translated = result.text
 
-    embed = discord.Embed(description=translated, color=0x4B8CF5)
-    embed.set_footer(
-        text=f"Translated from {src} by Google",
-        icon_url="https://upload.wikimedia.org/wikipedia/commons/d/db/Google_Translate_Icon.png",
-    )
+    embed = discord.Embed(description=translated, color=GT_COLOUR)
+    embed.set_footer(text=f"Translated from {src} by Google", icon_url=GT_ICON)
     await interaction.followup.send(embed=embed, ephemeral=True)
 
 
@@ -156,24 +237,26 @@ class Language(commands.Cog):
         view = ViewPages(ctx, codes)
         await view.start()
 
+    @cached(ttl=60 * 60)
+    async def fetch_jisho(self, query: str) -> list[dict]:
+        base = "https://jisho.org/api/v1/search/words?keyword="
+        payload = base + quote_from_bytes(query.encode("utf-8"), safe=b"")
+
+        async with self.bot.session.get(payload) as r:
+            json = orjson.loads(await r.read())
+            return json["data"]
+
     @commands.command()
     @commands.cooldown(1, 2, commands.BucketType.default)
     async def jisho(self, ctx: commands.Context, *, query: str):
         """Look up a word in Jisho (JP-EN / EN-JP dictionary)."""
-
-        base = "https://jisho.org/api/v1/search/words?keyword="
-        payload = base + quote_plus(query)
-
         await ctx.typing()
-        async with self.bot.session.get(payload) as r:
-            json = await r.json()
-            data = json["data"]
+        data = await self.fetch_jisho(query)
         if not data:
             return await ctx.reply("No results found.")
 
-        embeds = []
-        for meaning in data:
-            slug = meaning["slug"]
+        def make_embed(meaning: dict) -> discord.Embed:
+            slug = quote_from_bytes(meaning["slug"].encode("utf-8"))
 
             word = meaning["japanese"][0].get("word")
             reading = meaning["japanese"][0].get("reading")
@@ -190,26 +273,25 @@ class Language(commands.Cog):
             embed = discord.Embed(
                 title=word or reading,
                 description=f"{furigana or ''}\n{romaji}",
-                url=f"https://jisho.org/word/{quote(slug)}",
+                url=JISHO_WORD_URL + slug,
                 colour=0x56D926,
             )
-            embed.set_author(name="Jisho", icon_url="https://i.imgur.com/SO4IGvY.png")
+            embed.set_author(name="Jisho", icon_url=JISHO_ICON)
 
             for sense in meaning["senses"]:
-                parts_of_speech = ", ".join(sense["parts_of_speech"])
+                parts_of_speech = sense["parts_of_speech"]
                 definition = ", ".join(sense["english_definitions"])
-                tags = ", ".join(sense["tags"]) or ""
-                tags = tags if "Usually written using kana alone" not in tags else ""
-                name = f"{parts_of_speech}\n{tags}".strip()
+                tags = "" if JISHO_KANA_TAG in sense["tags"] else ", ".join(sense["tags"])
+                name = f"{', '.join(parts_of_speech)}\n{tags}".strip()
 
-                if "Wikipedia definition" in parts_of_speech:
+                if JISHO_WIKI_POS in parts_of_speech:
                     wiki = sense["links"][0]
                     definition = f"[{definition}]({wiki['url']})"
 
                 embed.add_field(name=name or "Special", value=definition, inline=False)
-            embeds.append(embed)
+            return embed
 
-        view = ViewPages(ctx, embeds)
+        view = ViewPages(ctx, data, page_factory=make_embed)
         await view.start()
 
     @commands.command(usage="[source:auto] [s:auto] [dest:en] [d:en] <text>")
@@ -242,35 +324,27 @@ class Language(commands.Cog):
         if not text:
             raise ArtemisError("No text provided.")
 
-        async with translator.lock:
-            try:
-                result = await translator.translate(text, src=src, dest=dest)
-            except ValueError as err:
-                return await ctx.reply(f"Error: {err}")
+        try:
+            result = await get_translator(self.bot.session).translate(text, src=src, dest=dest)
+        except ValueError as err:
+            return await ctx.reply(f"Error: {err}")
 
         src = result.src.lower()
-        try:
-            src = GT_LANGUAGES[src].title()
-        except Exception:
-            pass
-        dest = GT_LANGUAGES[result.dest.lower()].title()
+        src = GT_LANGUAGES_TITLED.get(src, src)
+        dest = GT_LANGUAGES_TITLED[result.dest.lower()]
         translation = result.text
 
         if len(translation) > 1024:
             buff = f"--- From {src} to {dest} ---\n{translation}".encode("utf-8")
-            buff = BytesIO(buff)
-            file = discord.File(buff, f"{src}-{dest}.txt")
+            file = discord.File(BytesIO(buff), f"{src}-{dest}.txt")
 
             return await ctx.reply(
                 file=file,
             )
 
-        embed = discord.Embed(colour=0x4B8CF5)
-        embed.set_author(
-            name="Google Translate",
-            icon_url="https://upload.wikimedia.org/wikipedia/commons/d/db/Google_Translate_Icon.png",
+        embed = make_translation_embed(
+            "Google Translate", GT_ICON, GT_COLOUR, src, dest, translation
         )
-        embed.add_field(name=f"From {src} to {dest}", value=translation)
         await ctx.reply(embed=embed)
 
     @commands.group(
@@ -334,19 +408,15 @@ class Language(commands.Cog):
 
         if len(translation) > 1024:
             buff = f"--- From {display_src} to {display_dest} ---\n{translation}".encode("utf-8")
-            buff = BytesIO(buff)
-            file = discord.File(buff, f"{display_src}-{display_dest}.txt")
+            file = discord.File(BytesIO(buff), f"{display_src}-{display_dest}.txt")
 
             return await ctx.reply(
                 file=file,
             )
 
-        embed = discord.Embed(colour=0x0F2B46)
-        embed.set_author(
-            name="DeepL",
-            icon_url="https://www.google.com/s2/favicons?domain=deepl.com&sz=64",
+        embed = make_translation_embed(
+            "DeepL", DEEPL_ICON, DEEPL_COLOUR, display_src, display_dest, translation
         )
-        embed.add_field(name=f"From {display_src} to {display_dest}", value=translation)
         if billed_characters:
             embed.set_footer(text=f"Billed characters: {billed_characters}")
         await ctx.reply(embed=embed)
@@ -363,6 +433,35 @@ class Language(commands.Cog):
             f"Characters used: **{usage.character_count}**\nCharacters left: **{usage.character_limit - usage.character_count}**\nQuota resets {format_dt(reset, "R")}."
         )
 
+    @cached(ttl=60 * 60)
+    async def get_tts_langs(self) -> dict[str, str]:
+        import gtts.lang
+
+        return await asyncio.to_thread(gtts.lang.tts_langs)
+
+    async def synthesize_tts(self, text: str, lang: str) -> bytes:
+        # gTTS splits long text into fragments and fetches them one by one,
+        # reuse its request building but fetch all fragments concurrently
+        import gtts
+
+        tts = gtts.gTTS(text, lang=lang, lang_check=False)
+
+        async def fetch(request) -> bytes:
+            async with self.bot.session.post(
+                request.url, data=request.body, headers=dict(request.headers)
+            ) as r:
+                if not r.ok:
+                    raise ArtemisError(f"Google TTS returned {r.status} {r.reason}")
+                data = await r.read()
+
+            audio = GTTS_AUDIO_RE.search(data)
+            if not audio:
+                raise ArtemisError("Google TTS returned no audio.")
+            return base64.b64decode(audio.group(1))
+
+        fragments = await asyncio.gather(*(fetch(request) for request in tts._prepare_requests()))
+        return b"".join(fragments)
+
     @commands.command(usage="[lang:en] [l:en] <text>")
     @commands.max_concurrency(1)
     async def tts(self, ctx: commands.Context, *, flags: TTSFlags):
@@ -383,65 +482,69 @@ class Language(commands.Cog):
         text = flags.text
         lang = flags.lang or "en"
 
-        if lang not in gtts.lang.tts_langs().keys():
+        if lang not in await self.get_tts_langs():
             return await ctx.reply("Sorry, I couldn't find that language!")
         elif not text:
             return await ctx.reply("No text provided.")
 
         await ctx.typing()
 
-        mp3_fp = BytesIO()
         filename = f"{ctx.author.display_name}-TTS-{lang}.mp3"
 
         with Stopwatch() as sw:
-            tts = await asyncio.to_thread(gtts.gTTS, text, lang=lang)
-            tts.write_to_fp(mp3_fp)
-            mp3_fp.seek(0)
+            mp3 = await self.synthesize_tts(text, lang)
 
-        discord_file = discord.File(mp3_fp, filename)
+        discord_file = discord.File(BytesIO(mp3), filename)
 
         diff = round(sw.result, 2)
         await ctx.reply(content=f"Finished in {diff}s.", file=discord_file)
 
-    @commands.command(aliases=["ud"])
-    async def urban(self, ctx: commands.Context, *, phrase):
-        """Look up a phrase in the Urban Dictionary."""
-        # thanks, Danny
-        ref_re = re.compile(r"(\[(.+?)\])")
+    @cached(ttl=60 * 60)
+    async def fetch_urban(self, phrase: str) -> list[dict]:
+        async def get(url: str, term: str) -> dict:
+            async with self.bot.session.get(url, params={"term": term}) as r:
+                return orjson.loads(await r.read())
 
-        def repl(m):
-            word = m.group(2)
-            return f'[{word}](http://{word.replace(" ", "-")}.urbanup.com)'
+        define_url = "http://api.urbandictionary.com/v0/define"
 
-        await ctx.typing()
-
-        params = {"term": phrase}
-        async with self.bot.session.get(
-            "https://api.urbandictionary.com/v0/autocomplete-extra", params=params
-        ) as r:
-            data = await r.json()
+        # optimistically define the phrase as typed while autocomplete resolves it
+        autocomplete, data = await asyncio.gather(
+            get("https://api.urbandictionary.com/v0/autocomplete-extra", phrase),
+            get(define_url, phrase),
+        )
 
-        results = data["results"]
+        results = autocomplete["results"]
         if not results:
             raise ArtemisError("No results found.")
 
-        params = {"term": results[0]["term"]}
-        async with self.bot.session.get(
-            "http://api.urbandictionary.com/v0/define", params=params
-        ) as r:
-            data = await r.json()
+        term = results[0]["term"]
+        if term.casefold() != phrase.casefold():
+            data = await get(define_url, term)
 
         results = data["list"]
         if not results:
             raise ArtemisError("No results found.")
+        return results
+
+    @commands.command(aliases=["ud"])
+    async def urban(self, ctx: commands.Context, *, phrase):
+        """Look up a phrase in the Urban Dictionary."""
+
+        def repl(m):
+            word = m.group(2)
+            return f'[{word}](http://{word.replace(" ", "-")}.urbanup.com)'
+
+        await ctx.typing()
+        results = await self.fetch_urban(phrase)
 
-        embeds = []
-        for result in results:
+        def make_embed(result: dict) -> discord.Embed:
             title = result["word"]
-            definition = ref_re.sub(repl, result["definition"])
-            example = ref_re.sub(repl, result["example"])
+            definition = UD_REF_RE.sub(repl, result["definition"])
+            example = UD_REF_RE.sub(repl, result["example"])
             permalink = result["permalink"]
-            written_on = pendulum.parse(result["written_on"][0:10], tz="UTC")
+            written_on = datetime.strptime(result["written_on"][:10], "%Y-%m-%d").replace(
+                tzinfo=timezone.utc
+            )
 
             if not example:
                 example = "No example provided."
@@ -458,65 +561,53 @@ class Language(commands.Cog):
                 text=f"{result['thumbs_up']} 👍 {result['thumbs_down']} 👎 • Written by {result['author']}"
             )
             embed.set_author(name="Urban Dictionary", icon_url="https://i.imgur.com/2NDCme4.png")
-            embeds.append(embed)
+            return embed
 
-        view = ViewPages(ctx, embeds)
+        view = ViewPages(ctx, results, page_factory=make_embed)
         await view.start()
 
-    @commands.command(usage="<wyraz/word>")
-    async def sjp(self, ctx: commands.Context, *, word: str):
-        """
-        :flag_pl:  Wyszukaj podany wyraz w słowniku języka polskiego ze strony `sjp.pl`.
-        Wpisy bez definicji są zastąpione źródłem, na jakie powołuje się strona.
-
-        :flag_gb:  Look up a word in the Polish dictionary sourced from `sjp.pl`.
-        Entries with missing definitions are replaced by a source referenced by the website.
-        """
+    @cached(ttl=60 * 60)
+    async def fetch_sjp(self, word: str) -> tuple[str, list[dict]] | None:
         headers = {"User-Agent": self.bot.user_agent}
-        SJP_ICON = "https://i.imgur.com/b4JLozn.png"
 
         params = {"q": word}
         async with self.bot.session.get(
             "https://sjp.pl/slownik/s/", params=params, headers=headers
         ) as r:
-            res = await r.json(content_type=None)
+            res = orjson.loads(await r.read())
         if not res["d"]:
-            return await ctx.reply(
-                f":flag_pl:  `{word}` nie występuje w słowniku.\n:flag_gb:  `{word}` not found in the dictionary."
-            )
+            return None
 
-        word = quote(res["d"][0])
+        word = quote_from_bytes(res["d"][0].encode("utf-8"))
         url = f"https://sjp.pl/{word}"
         async with self.bot.session.get(url, headers=headers) as r:
             html = await r.text()
-        soup = BeautifulSoup(html, "lxml")
+        tree = lxml.html.fromstring(html)
 
-        for element in soup.find_all("br"):
-            element.append("\n")
+        for element in tree.iter("br"):
+            element.tail = "\n" + (element.tail or "")
 
         entries = []
-        meanings = soup.select("h1")
-        for meaning in meanings:
-            word = meaning.text
+        for meaning in tree.iter("h1"):
+            word = meaning.text_content()
             original = None
             definitions = []
             dictionary = None
 
-            for element in meaning.next_siblings:
-                if element in meanings:
-                    break
-                if not isinstance(element, Tag):
+            for element in meaning.itersiblings():
+                if not isinstance(element.tag, str):
                     continue
+                if element.tag == "h1":
+                    break
                 if "margin: .5em" in element.get("style", ""):
-                    definitions = [
-                        re.sub(r"\d\.\s", "", defi).rstrip(";") for defi in element.text.split("\n")
-                    ]
-                orig = element.select_one(".lc")
+                    definitions = SJP_DEF_RE.findall(element.text_content())
+                orig = SJP_ROOT_XPATH(element)
                 if orig:
-                    original = orig.text if orig.text != word else None
-                td = element.select_one("td")
+                    orig = orig[0].text_content()
+                    original = orig if orig != word else None
+                td = SJP_TD_XPATH(element)
                 if td:
-                    dictionary = td.text
+                    dictionary = td[0].text_content()
             entries.append(
                 {
                     "word": word,
@@ -525,7 +616,26 @@ class Language(commands.Cog):
                     "dictionary": dictionary,
                 }
             )
+        return url, entries
+
+    @commands.command(usage="<wyraz/word>")
+    async def sjp(self, ctx: commands.Context, *, word: str):
+        """
+        :flag_pl:  Wyszukaj podany wyraz w słowniku języka polskiego ze strony `sjp.pl`.
+        Wpisy bez definicji są zastąpione źródłem, na jakie powołuje się strona.
+
+        :flag_gb:  Look up a word in the Polish dictionary sourced from `sjp.pl`.
+        Entries with missing definitions are replaced by a source referenced by the website.
+        """
+        SJP_ICON = "https://i.imgur.com/b4JLozn.png"
+
+        result = await self.fetch_sjp(word)
+        if not result:
+            return await ctx.reply(
+                f":flag_pl:  `{word}` nie występuje w słowniku.\n:flag_gb:  `{word}` not found in the dictionary."
+            )
 
+        url, entries = result
         embed = discord.Embed(colour=0x2266CC).set_author(name="SJP.pl", icon_url=SJP_ICON, url=url)
         for entry in entries:
             word = entry["root"] or entry["word"]
@@ -551,40 +661,40 @@ class Language(commands.Cog):
         icon = "https://upload.wikimedia.org/wikipedia/commons/thumb/3/31/Toki_Pona_flag.svg/320px-Toki_Pona_flag.svg.png"
         query = query.strip().replace("  ", " ").lower()
 
-        # try word lookup
-        entries = [nimi_lookup.get(query)]
-
-        # try definition lookup
-        if not entries[0]:
-            entries.pop()
-            for definition, entry in nimi_reverse_lookup.items():
-                if re.search(rf"\b{query}\b", definition.lower()):
-                    entries.append(entry)
-
-        if not entries:
+        # try word lookup, then definition lookup
+        idx = nimi_lookup.get(query)
+        if idx is not None:
+            indices = [idx]
+        elif re.fullmatch(r"\w+", query):
+            indices = nimi_token_index.get(query, [])
+        else:
+            pattern = re.compile(rf"\b{re.escape(query)}\b")
+            indices = [
+                idx
+                for idx, definition in enumerate(nimi_definitions)
+                if pattern.search(definition.lower())
+            ]
+
+        if not indices:
             return await ctx.reply("No results found.")
 
-        embeds = []
-        for entry in entries:
-            if not entry:
-                continue
-
+        def make_embed(idx: int) -> discord.Embed:
             embed = discord.Embed(
-                title=entry["word"],
-                description=entry["definition"],
+                title=nimi_words[idx],
+                description=nimi_definitions[idx],
                 url=spreadsheet,
                 color=0xFEFEFE,
             )
             embed.set_footer(text="nimi ale pona (2nd ed.)", icon_url=icon)
 
-            for k, v in entry.items():
-                if not v or k in ("word", "definition"):
+            for k, v in nimi_extras[idx].items():
+                if not v:
                     continue
                 k = k.title() if k != "creator(s)" else "Creator(s)"
                 embed.add_field(name=k, value=v, inline=False)
-            embeds.append(embed)
+            return embed
 
-        view = ViewPages(ctx, embeds)
+        view = ViewPages(ctx, indices, page_factory=make_embed)
         await view.start()
 
 
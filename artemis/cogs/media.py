@@ -32,6 +32,10 @@ if TYPE_CHECKING:
 
 yt_dlp.utils.bug_reports_message = lambda: ""
 
+YOUTUBE_ID_RE = re.compile(r"(?:youtube\.com/watch\?v=|youtu\.be/|youtube\.com/shorts/)([\w-]+)")
+TIMESTAMP_RE = re.compile(r"\d{2}:\d{2}:\d{2}(?:\.\d{1,3})?")
+SECONDS_RE = re.compile(r"\d{1,5}(?:\.\d{1,3})?")
+
 DEFAULT_OPTS = {
     "quiet": True,
     "noprogress": True,
@@ -93,9 +97,7 @@ class Media(commands.Cog):
 
         await ctx.typing()
 
-        youtube = re.search(
-            r"(?:youtube\.com/watch\?v=|youtu\.be/|youtube\.com/shorts/)([\w-]+)", url
-        )
+        youtube = YOUTUBE_ID_RE.search(url)
         if youtube:
             thumbnail = f"https://i.ytimg.com/vi/{youtube.group(1)}/maxresdefault.jpg"
         else:
@@ -261,7 +263,7 @@ class Media(commands.Cog):
 
             title = info_dict.get("title")
             url = info_dict["url"]
-            result = await utils.run_cmd(f'mediainfo "{url}"')
+            result = await utils.run_cmd(["mediainfo", url], timeout=60)
 
             if not result.ok:
                 return await ctx.reply(result.decoded)
@@ -284,13 +286,11 @@ class Media(commands.Cog):
         - `SS` or `SS.ms`
         - `HH:MM:SS` or `HH:MM:SS.ms`
         """
-        TIMESTAMP_RE = r"\d{2}:\d{2}:\d{2}(?:\.\d{1,3})?"
-        SECONDS_RE = r"\d{1,5}(?:\.\d{1,3})?"
         url = url.strip("<>")
         utils.check_for_ssrf(url)
         ytdl_opts = {**DEFAULT_OPTS, "format": "bv*/b"}
 
-        if not (re.fullmatch(TIMESTAMP_RE, timestamp) or re.fullmatch(SECONDS_RE, timestamp)):
+        if not (TIMESTAMP_RE.fullmatch(timestamp) or SECONDS_RE.fullmatch(timestamp)):
             return await ctx.reply("Invalid timestamp format, check out `$help screencap`.")
 
         async with ctx.typing():
@@ -299,10 +299,23 @@ class Media(commands.Cog):
             title = info_dict["title"]
             url = info_dict["url"]
 
-            if info_dict.get("is_live"):
-                args = f'ffmpeg -hide_banner -loglevel warning -i "{url}" -vframes 1 -c:v png -f image2 -'
-            else:
-                args = f'ffmpeg -hide_banner -loglevel warning -ss {timestamp} -i "{url}" -vframes 1 -c:v png -f image2 -'
+            seek = [] if info_dict.get("is_live") else ["-ss", timestamp]
+            args = [
+                "ffmpeg",
+                "-hide_banner",
+                "-loglevel",
+                "warning",
+                *seek,
+                "-i",
+                url,
+                "-vframes",
+                "1",
+                "-c:v",
+                "png",
+                "-f",
+                "image2",
+                "-",
+            ]
 
             result = await utils.run_cmd(args)
             stdout, stderr = result.stdout, result.stderr
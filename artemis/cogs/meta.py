@@ -50,9 +50,10 @@ class Meta(commands.Cog):
         if not url.startswith(("https://", "http://")):
             url = f"https://{url}"
 
-        if not is_valid_url(url):
+        parsed = is_valid_url(url)
+        if not parsed:
             raise ArtemisError("That doesn't look like a valid URL.")
-        check_for_ssrf(url)
+        check_for_ssrf(parsed)
 
         headers = {"User-Agent": self.bot.user_agent}
 
@@ -1,13 +1,15 @@
 from __future__ import annotations
 
 import asyncio
-import json
-import re
-from collections import deque
+import logging
+import time
+from collections import OrderedDict, deque
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Optional
 
+import aiohttp
 import discord
+import orjson
 from discord.ext import commands
 
 from .. import utils
@@ -17,6 +19,8 @@ from .media import DEFAULT_OPTS, run_ytdlp
 if TYPE_CHECKING:
     from ..bot import Artemis
 
+log = logging.getLogger("artemis")
+
 
 async def in_voice_channel(ctx: commands.Context):
     client = ctx.voice_client
@@ -37,6 +41,41 @@ async def audio_playing(ctx: commands.Context):
         raise commands.CheckFailure("Not playing any audio.")
 
 
+# stream URLs are signed for ~6 hours
+RESOLVE_CACHE_TTL = 5 * 60 * 60
+RESOLVE_CACHE_SIZE = 64
+
+YT_INITIAL_DATA_START = b"var ytInitialData = "
+YT_INITIAL_DATA_END = b";</script>"
+
+
+async def read_yt_initial_data(stream: aiohttp.StreamReader) -> memoryview | None:
+    """Reads a YouTube page only as far as the end of its ytInitialData JSON and returns it."""
+    buff = bytearray()
+    marker = YT_INITIAL_DATA_START
+    found = False
+
+    async for chunk in stream.iter_any():
+        # only rescan the tail where a marker could straddle two chunks
+        offset = max(len(buff) - len(marker) + 1, 0)
+        buff += chunk
+        idx = buff.find(marker, offset)
+
+        if not found:
+            if idx == -1:
+                del buff[: max(len(buff) - len(marker) + 1, 0)]
+                continue
+            del buff[: idx + len(marker)]
+            found = True
+            marker = YT_INITIAL_DATA_END
+            idx = buff.find(marker)
+
+        if idx != -1:
+            # orjson parses buffers directly, no need for a bytes copy
+            return memoryview(buff)[:idx]
+    return None
+
+
 @dataclass
 class SongInfo:
     title: str
@@ -45,6 +84,8 @@ class SongInfo:
     embed: discord.Embed
     requestor: int
     ctx: commands.Context
+    acodec: Optional[str] = None
+    source: Optional[discord.FFmpegOpusAudio] = None
 
 
 @dataclass
@@ -68,12 +109,25 @@ class Music(commands.Cog):
         }
         self.state = MusicState(None, False)
         self.queue: deque[SongInfo] = deque([], 10)
+        self.resolve_cache: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self.resolve_locks: dict[str, asyncio.Lock] = {}
+        self.prefetch_task: Optional[asyncio.Task] = None
 
     def cleanup(self):
         self.state.connected = False
         self.state.song = None
+        self.cancel_prefetch()
         self.queue.clear()
 
+    def cancel_prefetch(self):
+        if self.prefetch_task:
+            self.prefetch_task.cancel()
+            self.prefetch_task = None
+        for song in self.queue:
+            if song.source:
+                song.source.cleanup()
+                song.source = None
+
     async def cog_check(self, ctx: commands.Context):
         if ctx.guild.id not in (338684864008290304, 789168201295724574):
             raise commands.CheckFailure("Music features are not supported in this server.")
@@ -106,13 +160,11 @@ class Music(commands.Cog):
         async with self.bot.session.get(
             "https://youtube.com/results", headers=headers, params=params
         ) as r:
-            html = await r.text()
+            data = await read_yt_initial_data(r.content)
 
-        data_res = re.search(r"var\s?ytInitialData\s?=\s?(\{.*?\});", html)
-        if not data_res:
+        if not data:
             return []
-        data = data_res.group(1)
-        data = json.loads(data)
+        data = orjson.loads(data)
         videos = data["contents"]["twoColumnSearchResultsRenderer"]["primaryContents"][
             "sectionListRenderer"
         ]["contents"][0]["itemSectionRenderer"]["contents"]
@@ -134,6 +186,31 @@ class Music(commands.Cog):
                 )
         return results
 
+    async def extract_info(self, url_or_query: str) -> dict:
+        # concurrent requests for the same song share one yt-dlp run
+        lock = self.resolve_locks.setdefault(url_or_query, asyncio.Lock())
+        try:
+            async with lock:
+                cached = self.resolve_cache.get(url_or_query)
+                if cached and time.monotonic() - cached[0] < RESOLVE_CACHE_TTL:
+                    self.resolve_cache.move_to_end(url_or_query)
+                    return cached[1]
+
+                ytdl_opts = {**DEFAULT_OPTS, "default_search": "auto", "format": "251/ba*"}
+                info_dict = await run_ytdlp(url_or_query, ytdl_opts, download=False)
+
+                if info_dict.get("entries"):
+                    info_dict = info_dict["entries"][0]
+
+                self.resolve_cache[url_or_query] = (time.monotonic(), info_dict)
+                self.resolve_cache.move_to_end(url_or_query)
+                if len(self.resolve_cache) > RESOLVE_CACHE_SIZE:
+                    self.resolve_cache.popitem(last=False)
+                return info_dict
+        finally:
+            if not lock.locked() and self.resolve_locks.get(url_or_query) is lock:
+                del self.resolve_locks[url_or_query]
+
     async def resolve_query(self, ctx: commands.Context, query: str):
         url_or_query = query.strip("<>")
         if not utils.is_valid_url(url_or_query):  # Try scraping YT search
@@ -157,23 +234,47 @@ class Music(commands.Cog):
         else:
             utils.check_for_ssrf(url_or_query)
 
-        ytdl_opts = {**DEFAULT_OPTS, "default_search": "auto", "format": "251/ba*"}
-        info_dict = await run_ytdlp(url_or_query, ytdl_opts, download=False)
-
-        if info_dict.get("entries"):
-            info_dict = info_dict["entries"][0]
+        info_dict = await self.extract_info(url_or_query)
 
         url = info_dict["url"]
         webpage_url = info_dict.get("webpage_url")
         title = info_dict.get("title") or info_dict.get("id")
         embed = self.build_embed(ctx, info_dict)
-        return SongInfo(title, url, webpage_url, embed, ctx.author.id, ctx)
+        acodec = info_dict.get("acodec")
+        return SongInfo(title, url, webpage_url, embed, ctx.author.id, ctx, acodec)
+
+    async def create_source(self, song: SongInfo) -> discord.FFmpegOpusAudio:
+        # format 251 is already opus, skip the ffprobe run and pass it through
+        if song.acodec == "opus":
+            return discord.FFmpegOpusAudio(song.url, codec="copy", **self.ffmpeg_options)
+        return await discord.FFmpegOpusAudio.from_probe(song.url, **self.ffmpeg_options)
+
+    async def prefetch(self, song: SongInfo):
+        try:
+            song.source = await self.create_source(song)
+        except Exception:
+            log.exception("Failed to prefetch %s", song.title)
+
+    def schedule_prefetch(self):
+        """Starts preparing the next queued song's source while the current one plays."""
+        if not self.queue or self.queue[0].source:
+            return
+        if self.prefetch_task and not self.prefetch_task.done():
+            return
+        self.prefetch_task = asyncio.create_task(self.prefetch(self.queue[0]))
+
+    async def play_next(self):
+        try:
+            await self.real_play()
+        except Exception:
+            log.exception("Failed to play the next song")
 
     async def real_play(self):
+        # runs on the audio thread, hand off to the loop without waiting on it
         def my_after(error):
-            coro = self.real_play()
-            fut = asyncio.run_coroutine_threadsafe(coro, self.bot.loop)
-            fut.result()
+            if error:
+                log.error("Player error: %s", error)
+            asyncio.run_coroutine_threadsafe(self.play_next(), self.bot.loop)
 
         try:
             self.state.song = next_song = self.queue.popleft()
@@ -181,8 +282,21 @@ class Music(commands.Cog):
             self.state.song = None
             return
 
-        source = await discord.FFmpegOpusAudio.from_probe(next_song.url, **self.ffmpeg_options)
-        next_song.ctx.voice_client.play(source, after=my_after)
+        # wait for the next song's source if it's still being prepared
+        if self.prefetch_task and not self.prefetch_task.done():
+            await asyncio.wait([self.prefetch_task])
+
+        source = next_song.source or await self.create_source(next_song)
+        next_song.source = None
+
+        # the bot may have been disconnected while the source was being created
+        voice_client = next_song.ctx.voice_client
+        if not voice_client:
+            self.state.song = None
+            return
+
+        voice_client.play(source, after=my_after)
+        self.schedule_prefetch()
         await next_song.ctx.send(":musical_note:  Now playing:", embed=next_song.embed)
 
     @commands.command()
@@ -203,16 +317,26 @@ class Music(commands.Cog):
     async def play(self, ctx: commands.Context, *, url_or_query: str):
         await ctx.typing()
 
+        if ctx.voice_client.is_playing() and len(self.queue) == self.queue.maxlen:
+            return await ctx.reply("The queue is full!")
+
+        song = await self.resolve_query(ctx, url_or_query)
+        if not song:
+            return
+
+        # the bot may have been disconnected while resolving
+        if not ctx.voice_client:
+            return await ctx.reply("I am not connected to a voice channel.")
+
+        # playback and the queue may have changed while resolving,
+        # a full deque would silently drop its oldest song on append
         if ctx.voice_client.is_playing():
-            if len(self.queue) == 10:
+            if len(self.queue) == self.queue.maxlen:
                 return await ctx.reply("The queue is full!")
-            song = await self.resolve_query(ctx, url_or_query)
-            if not song:
-                return
             self.queue.append(song)
+            self.schedule_prefetch()
             return await ctx.reply(":ballot_box_with_check:  Added to queue.", embed=song.embed)
 
-        song = await self.resolve_query(ctx, url_or_query)
         self.queue.append(song)
         await self.real_play()
 
@@ -223,9 +347,10 @@ class Music(commands.Cog):
         if not self.queue:
             return await ctx.reply("The queue is empty.")
 
-        desc = ""
-        for idx, song in enumerate(self.queue, start=1):
-            desc += f"`{idx}.` [{song.title}]({song.webpage_url})\n"
+        desc = "\n".join(
+            f"`{idx}.` [{song.title}]({song.webpage_url})"
+            for idx, song in enumerate(self.queue, start=1)
+        )
 
         embed = discord.Embed(title="🎵  Song Queue", description=desc, color=self.bot.invisible)
         await ctx.reply(embed=embed)
@@ -238,6 +363,7 @@ class Music(commands.Cog):
         if not self.queue:
             return await ctx.reply("The queue is already empty.")
         else:
+            self.cancel_prefetch()
             self.queue.clear()
             return await ctx.reply("The queue has been cleared.")
 
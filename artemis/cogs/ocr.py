@@ -18,6 +18,13 @@ from ..utils.iso_639 import get_language_name
 if TYPE_CHECKING:
     from ..bot import Artemis
 
+TESSERACT_LANGUAGE_SET = frozenset(TESSERACT_LANGUAGES)
+OCR_IMAGE_TYPES = frozenset({"image/jpeg", "image/png"})
+UNSUPPORTED_LANGUAGE_MSG = (
+    "Unsupported language code, list of supported languages:\n\n"
+    + "\n".join(f"`{lang}` - {get_language_name(lang[:3])}" for lang in TESSERACT_LANGUAGES)
+)
+
 
 class OCR(commands.Cog):
     def __init__(self, bot: Artemis):
@@ -38,14 +45,9 @@ class OCR(commands.Cog):
 
         await ctx.typing()
 
-        for lang_code in lang.split("+"):
-            if lang_code not in TESSERACT_LANGUAGES:
-                msg = "Unsupported language code, list of supported languages:\n\n"
-                msg += "\n".join(
-                    (f"`{lang}` - {get_language_name(lang[:3])}" for lang in TESSERACT_LANGUAGES)
-                )
-                embed = discord.Embed(description=msg, color=discord.Color.red())
-                return await ctx.reply(embed=embed)
+        if not TESSERACT_LANGUAGE_SET.issuperset(lang.split("+")):
+            embed = discord.Embed(description=UNSUPPORTED_LANGUAGE_MSG, color=discord.Color.red())
+            return await ctx.reply(embed=embed)
 
         if url or ctx.message.attachments:
             message = ctx.message
@@ -55,12 +57,15 @@ class OCR(commands.Cog):
         if not message:
             raise ArtemisError("Could not find any images.")
 
-        image = await utils.get_file_from_attachment_or_url(
-            ctx, message, url, ["image/jpeg", "image/png"]
-        )
+        source = utils.get_source_from_attachment_or_url(ctx, message, url, OCR_IMAGE_TYPES)
 
-        args = f"tesseract stdin stdout -l {lang}"
-        result = await utils.run_cmd(args, input=image)
+        args = ["tesseract", "stdin", "stdout", "-l", lang]
+        if isinstance(source, discord.Attachment):
+            result = await utils.run_cmd(args, input=await source.read())
+        else:
+            # pipe the download into tesseract as it arrives
+            async with utils.open_url(ctx, source, OCR_IMAGE_TYPES) as r:
+                result = await utils.stream_to_cmd(args, r.content)
         stdout, stderr = result.stdout, result.stderr
 
         if not result.ok:
@@ -95,9 +100,7 @@ class OCR(commands.Cog):
         if not message:
             raise ArtemisError("Could not find any images.")
 
-        image = await utils.get_file_from_attachment_or_url(
-            ctx, message, url, ["image/jpeg", "image/png"]
-        )
+        image = await utils.get_file_from_attachment_or_url(ctx, message, url, OCR_IMAGE_TYPES)
 
         try:
             image = await compress_image(image, size=1000)
@@ -1,11 +1,13 @@
 from __future__ import annotations, unicode_literals
 
+import asyncio
 import json
-import os
+import re
 import typing
 from base64 import b64decode
 from io import StringIO
 from typing import TYPE_CHECKING, Optional
+from urllib.parse import urlparse
 
 import discord
 import magic
@@ -13,6 +15,7 @@ from discord.ext import commands
 from jishaku import codeblocks
 import pendulum
 
+from . import EXTENSIONS
 from .. import utils
 from ..utils.common import ArtemisError
 from ..utils.constants import TEMP_DIR
@@ -21,10 +24,20 @@ from ..utils.views import BaseView
 if TYPE_CHECKING:
     from ..bot import Artemis
 
+CATBOX_ID_RE = re.compile(r"([^/<>]+)>?$")
+OPUS_OUTPUT_ARGS = ["-c:a", "libopus", "-vbr", "on", "-b:a", "128k"]
+
+
+def url_basename(url: str) -> str:
+    return urlparse(url).path.rsplit("/", 1)[-1]
+
 
 class Owner(commands.Cog, command_attrs={"hidden": True}):
     def __init__(self, bot: Artemis):
         self.bot: Artemis = bot
+        # loading the libmagic database is the expensive part, do it once
+        self.magic = magic.Magic()
+        self.magic_mime = magic.Magic(mime=True)
 
     async def cog_check(self, ctx: commands.Context):
         if ctx.author.id == self.bot.owner_id:
@@ -59,13 +72,18 @@ class Owner(commands.Cog, command_attrs={"hidden": True}):
     async def _reload(self, ctx: commands.Context, extension: Optional[str]):
         """Reloads a cog."""
         if not extension:
-            try:
-                for filename in os.listdir("./cogs"):
-                    if filename.endswith(".py") and filename != "__init__.py":
-                        await self.bot.reload_extension(f"cogs.{filename[:-3]}")
+            results = await asyncio.gather(
+                *(self.bot.reload_extension(name) for name in EXTENSIONS), return_exceptions=True
+            )
+            failed = [
+                f"{name}: {result}"
+                for name, result in zip(EXTENSIONS, results)
+                if isinstance(result, Exception)
+            ]
+            if failed:
+                await ctx.send("Failed to reload:\n" + "\n".join(failed))
+            else:
                 await ctx.send("Reloaded all cogs.")
-            except Exception as e:
-                await ctx.send(e)
         else:
             try:
                 await self.bot.reload_extension(f"cogs.{extension}")
@@ -101,7 +119,7 @@ class Owner(commands.Cog, command_attrs={"hidden": True}):
 
         await ctx.typing()
 
-        res = await utils.run_cmd("git pull")
+        res = await utils.run_cmd(["git", "pull"], timeout=60)
         output = res.decoded
 
         embed = discord.Embed(
@@ -211,8 +229,8 @@ except Exception:
             if not buff:
                 return await ctx.reply("No data in body.")
 
-            mime = magic.from_buffer(buff)
-            content_type = content_type or magic.from_buffer(buff, mime=True)
+            mime = self.magic.from_buffer(buff)
+            content_type = content_type or self.magic_mime.from_buffer(buff)
             return await ctx.reply(f"{mime}\n`{content_type}`")
 
     @dev.command()
@@ -239,7 +257,7 @@ except Exception:
     @dev.command()
     async def catdel(self, ctx: commands.Context, *files):
         """Deletes catbox files."""
-        files = " ".join([f.strip("<>").split("/")[-1] for f in files])
+        files = " ".join(m[1] for f in files if (m := CATBOX_ID_RE.search(f)))
         resp = await self.bot.catbox.delete(files)
         await ctx.reply(resp)
 
@@ -247,7 +265,7 @@ except Exception:
     async def ping(self, ctx: commands.Context, host: str):
         """Pings a host."""
         async with ctx.typing():
-            result = await utils.run_cmd(f"ping -n -c 3 {host}")
+            result = await utils.run_cmd(["ping", "-n", "-c", "3", host])
             cb_wrapped = self.bot.codeblock(result.decoded, "c")
         await ctx.send(cb_wrapped)
 
@@ -261,11 +279,32 @@ except Exception:
             pass
         return await ctx.send(data)
 
+    def ffmpeg_input_args(self, url: str) -> list[str]:
+        return [
+            "ffmpeg",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-headers",
+            f"User-Agent: {self.bot.user_agent}",
+            "-i",
+            url,
+        ]
+
     @dev.command()
     async def mp4ify(self, ctx: commands.Context, *, url: utils.URL):
         """Makes the video playable in Discord and browsers."""
-        args = f'ffmpeg -hide_banner -loglevel error -headers "User-Agent: {self.bot.user_agent}" -i "{url}" -pix_fmt yuv420p -f mp4 -movflags frag_keyframe+empty_moov -'
-        filename = url.split("/")[-1].split("?")[0].split("#")[0]
+        args = [
+            *self.ffmpeg_input_args(url),
+            "-pix_fmt",
+            "yuv420p",
+            "-f",
+            "mp4",
+            "-movflags",
+            "frag_keyframe+empty_moov",
+            "-",
+        ]
+        filename = url_basename(url)
         if not filename.endswith(".mp4"):
             filename += ".mp4"
 
@@ -280,8 +319,8 @@ except Exception:
     @dev.command()
     async def oggify(self, ctx: commands.Context, *, url: utils.URL):
         """Makes the audio playable in Discord and browsers."""
-        args = f'ffmpeg -hide_banner -loglevel error -headers "User-Agent: {self.bot.user_agent}" -i "{url}" -c:a libopus -vbr on -b:a 128k -f opus -'
-        filename = url.split("/")[-1].split("?")[0].split("#")[0]
+        args = [*self.ffmpeg_input_args(url), *OPUS_OUTPUT_ARGS, "-f", "opus", "-"]
+        filename = url_basename(url)
         basename = filename.split(".")[0]
         filename = basename + ".ogg"
 
@@ -309,9 +348,9 @@ except Exception:
         else:
             filters = f"atempo={factor}"
 
-        args = f'ffmpeg -hide_banner -loglevel error -headers "User-Agent: {self.bot.user_agent}" -i "{url}" -c:a libopus -vbr on -b:a 128k -af "{filters}" -f opus -'
+        args = [*self.ffmpeg_input_args(url), *OPUS_OUTPUT_ARGS, "-af", filters, "-f", "opus", "-"]
 
-        filename = url.split("/")[-1].split("?")[0].split("#")[0]
+        filename = url_basename(url)
         basename = filename.split(".")[0]
         filename = f"{basename}_{target.upper()}.ogg"
 
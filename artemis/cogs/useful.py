@@ -1,21 +1,28 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import contextlib
 import re
+import struct
 import unicodedata
+import zlib
+from functools import lru_cache
 from io import BytesIO, StringIO
+from itertools import islice
 from typing import TYPE_CHECKING, Optional
-from urllib.parse import quote, urlencode
+from urllib.parse import quote, urlencode, urlparse
 
 import aiohttp
 import discord
+import lxml.html
+import orjson
 import pendulum
 from aiocache import cached
-from bs4 import BeautifulSoup
 from colorama import Fore, Style
 from discord.ext import commands
 from discord.utils import format_dt
 from humanize import intcomma
+from lxml import etree
 from PIL import Image
 
 from .. import utils
@@ -24,14 +31,156 @@ from ..utils.common import ArtemisError
 from ..utils.flags import WikipediaFlags
 from ..utils.views import DropdownView
 
+try:
+    from pyzbar.pyzbar import ZBarSymbol
+    from pyzbar.pyzbar import decode as zbar_decode
+except ImportError:  # also raised when the zbar shared library is missing
+    zbar_decode = None
+
 if TYPE_CHECKING:
     from ..bot import Artemis
 
+REDIRECT_TIMEOUT = aiohttp.ClientTimeout(total=5)
+REDIRECT_SCAN_SIZE = 16 * 1024
+CURRENCIES = frozenset(utils.SUPPORTED_CURRENCIES)
+AMOUNT_RE = re.compile(r"\d*(?:\.?|\,?)\d*$")
+JS_REDIRECT_RE = re.compile(
+    r"location\.(?:replace|assign)\([\"\'](.+)[\"\']\)|location\.href\s?=\s?[\"\'](.+)[\"\']"
+)
+LOC_RE = re.compile(r"Location:\s*(.*?)\s*\[")
+CSE_TOKEN_RE = re.compile(r"\"cse_token\":\s*\"(.*?)\"")
+CSELIBV_RE = re.compile(r"\"cselibVersion\":\s*\"(.*?)\"")
+CSE_RESULTS_RE = re.compile(r"\"results\":\s*(\[.*?\]),", re.S)
+SAT_POS_RE = re.compile(r"(\d{1,3}(?:\.\d)?).*?((?:E|W))")
+ONID_TID_RE = re.compile(r"(\d+)-(\d+)")
+TP_RE = re.compile(r"tp (\d+)")
+LYNGSAT_TIMEOUT = 10
+
+WIKI_API_BASE = "https://{}.wikipedia.org/w/api.php"
+WIKI_SEARCH = WIKI_API_BASE + "?action=opensearch&format=json&redirects=resolve&search={}"
+WIKI_EXTRACT = (
+    WIKI_API_BASE
+    + "?action=query&format=json&prop=extracts|pageimages&exintro&explaintext&exsentences=5&piprop=original&redirects=1&titles={}"
+)
+WIKI_RANDOM = WIKI_API_BASE + "?action=query&format=json&redirects=1&list=random&rnnamespace=0"
+
+
+LYNGSAT_TABLE_XPATH = etree.XPath("(//text()[. = 'Satellite'])[1]/ancestor::table[1]")
+LYNGSAT_CELL_XPATH = etree.XPath("(//text()[. = $text])[1]/ancestor::td[1]")
+LYNGSAT_TP_XPATH = etree.XPath("preceding::td[@rowspan] | ancestor::td[@rowspan]")
+
+
+@utils.in_executor
+def decode_qr(image: bytes) -> str | None:
+    with Image.open(BytesIO(image)) as im:
+        results = zbar_decode(im, symbols=[ZBarSymbol.QRCODE])
+    return results[0].data.decode() if results else None
+
+
+@lru_cache(maxsize=1024)
+def resolve_timezone(name: str, cutoff: float | None = None) -> str | None:
+    name = utils.COMMON_TIMEZONES.get(name.lower(), name)
+    return utils.fuzzy_search_one(name, pendulum.timezones, cutoff=cutoff)
+
+
+def png_chunk(tag: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+
+@lru_cache(maxsize=256)
+def solid_png(rgb: tuple[int, int, int], size: int = 250) -> bytes:
+    """Builds a single-colour RGB PNG by hand, cached per colour since compressing isn't free."""
+    header = struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)
+    # every scanline is filter type 0 followed by the raw pixels
+    pixels = (b"\x00" + bytes(rgb) * size) * size
+    return b"".join(
+        (
+            b"\x89PNG\r\n\x1a\n",
+            png_chunk(b"IHDR", header),
+            png_chunk(b"IDAT", zlib.compress(pixels)),
+            png_chunk(b"IEND", b""),
+        )
+    )
+
+
+def br_text(element: lxml.html.HtmlElement, sep: str = " ") -> str:
+    for br in element.iter("br"):
+        br.tail = sep + (br.tail or "")
+    return element.text_content()
+
+
+@utils.in_executor
+def parse_lyngsat_channel(html: str) -> list[dict]:
+    """Extracts the satellites carrying a channel from its LyngSat page."""
+    table = LYNGSAT_TABLE_XPATH(lxml.html.fromstring(html))[0]
+
+    satellites = []
+    for row in list(table.iter("tr"))[2:-1]:
+        fields = list(row.iter("td"))
+        if len(fields) < 7:
+            continue
+        link = next(fields[1].iter("a"), None)
+        if link is None:
+            continue
+
+        desc = []
+        if fields[6].text_content():
+            desc.append(br_text(fields[6]))
+        if len(fields) > 7 and fields[7].text_content():
+            desc.append(br_text(fields[7]).lower())
+
+        packages = fields[9].iter("a") if len(fields) > 9 else []
+        satellites.append(
+            {
+                "pos": fields[0].text_content().strip(),
+                "name": fields[1].text_content(),
+                "url": link.get("href"),
+                "desc": ", ".join(desc) if desc else None,
+                "packages": [
+                    {"name": a.text_content().strip(), "url": a.get("href")} for a in packages
+                ],
+            }
+        )
+    return satellites
+
+
+@utils.in_executor
+def parse_lyngsat_satellite(html: str, package: str) -> str | None:
+    """Returns the ONID-TID cell of a provider from a LyngSat satellite page."""
+    cell = LYNGSAT_CELL_XPATH(lxml.html.fromstring(html), text=package)
+    if not cell:
+        return None
+    return list(cell[0].itersiblings("td"))[1].text_content().strip()
+
+
+@utils.in_executor
+def parse_lyngsat_package(html: str, channel: str) -> tuple[str, str] | None:
+    """Returns the SID and transponder cell text of a channel from a LyngSat provider page."""
+    cell = LYNGSAT_CELL_XPATH(lxml.html.fromstring(html), text=channel)
+    if not cell:
+        return None
+    sid = list(cell[0].itersiblings("td", preceding=True))[2].text_content().strip()
+    # nearest first, like walking backwards through the document
+    tp = LYNGSAT_TP_XPATH(cell[0])[-2]
+    return sid, br_text(tp, "\n")
+
 
 class Useful(commands.Cog):
     def __init__(self, bot: Artemis):
         self.bot: Artemis = bot
 
+    async def cog_load(self):
+        async def _prewarm():
+            # the first enigma2 call shouldn't have to wait on cse.google.com
+            with contextlib.suppress(Exception):
+                await self.get_lyngsat_cse_url()
+
+        # keep a reference so the task isn't garbage collected mid-flight
+        self.prewarm_task = asyncio.create_task(_prewarm())
+
+    async def cog_unload(self):
+        self.prewarm_task.cancel()
+
     @commands.command(aliases=["char"])
     async def charinfo(self, ctx: commands.Context, *, characters: str):
         """Shows you information about a number of characters using unicode data lookup."""
@@ -43,9 +192,16 @@ class Useful(commands.Cog):
             name = unicodedata.name(c, "Name not found.")
             return f"`{c}` - `U+{digit:>04}` - **[{name}](http://www.fileformat.info/info/unicode/char/{digit})**"
 
-        desc = "\n".join(map(to_string, characters))
-        if len(desc) > 4096:
-            return await ctx.reply("Output too long to display.")
+        lines = []
+        total = -1  # no newline before the first line
+        for c in characters:
+            line = to_string(c)
+            total += len(line) + 1
+            # bail out as soon as it can't fit instead of formatting the rest
+            if total > 4096:
+                return await ctx.reply("Output too long to display.")
+            lines.append(line)
+        desc = "\n".join(lines)
         await ctx.reply(
             embed=discord.Embed(
                 title="Character Information",
@@ -59,18 +215,25 @@ class Useful(commands.Cog):
     async def redirect(self, ctx: commands.Context, url: utils.URL):
         """Checks if the given URL is a redirect and shows where it points to."""
         headers = {"User-Agent": self.bot.user_agent}
-        js_redirects = r"location\.(?:replace|assign)\([\"\'](.+)[\"\']\)|location\.href\s?=\s?[\"\'](.+)[\"\']"
         redirect_url = None
 
         await ctx.typing()
 
         async def check_for_redirects(url, is_js_redirect=False):
             try:
-                timeout = aiohttp.ClientTimeout(total=5)
-                async with self.bot.session.get(url, timeout=timeout, headers=headers) as r:
+                async with self.bot.session.get(
+                    url, timeout=REDIRECT_TIMEOUT, headers=headers
+                ) as r:
                     if "text/html" in r.content_type:
-                        html = await r.text()
-                        js_redirect = re.search(js_redirects, html)
+                        # JS redirects live in the head, no need to download the whole page
+                        raw = bytearray()
+                        while len(raw) < REDIRECT_SCAN_SIZE:
+                            chunk = await r.content.read(REDIRECT_SCAN_SIZE - len(raw))
+                            if not chunk:
+                                break
+                            raw += chunk
+                        html = raw.decode(r.charset or "utf-8", "replace")
+                        js_redirect = JS_REDIRECT_RE.search(html)
                         if js_redirect:
                             redirect_url = js_redirect[1] or js_redirect[2]
                             return await check_for_redirects(redirect_url, is_js_redirect=True)
@@ -103,11 +266,11 @@ class Useful(commands.Cog):
         """
         cur_from = cur_from.upper()
         cur_to = cur_to.upper()
-        currencies = ", ".join(utils.SUPPORTED_CURRENCIES)
 
-        if not re.match(r"\d*(?:\.?|\,?)\d*$", amount):
+        if not AMOUNT_RE.match(amount):
             return await ctx.reply("Invalid amount.")
-        elif cur_from not in currencies or cur_to not in currencies:
+        elif cur_from not in CURRENCIES or cur_to not in CURRENCIES:
+            currencies = ", ".join(utils.SUPPORTED_CURRENCIES)
             return await ctx.reply(
                 embed=discord.Embed(
                     title="Invalid or unsupported currency.",
@@ -125,12 +288,13 @@ class Useful(commands.Cog):
             return await ctx.reply(embed=embed)
 
         try:
-            params = {"amount": amount, "from": cur_from, "to": cur_to}
-            async with self.bot.session.get(
-                "https://api.frankfurter.app/latest", params=params
-            ) as r:
-                json = await r.json()
-            result = round(json["rates"][cur_to], 2)
+            value = float(amount)
+        except ValueError:
+            return await ctx.reply("Invalid amount.")
+
+        try:
+            rates = await self.get_latest_rates(cur_from)
+            result = round(value * rates[cur_to], 2)
 
             desc = f"{intcomma(amount)} {Fore.BLUE}{cur_from}{Style.RESET_ALL} = {intcomma(result)} {Fore.BLUE}{cur_to}"
             embed.description = self.bot.codeblock(desc, "ansi")
@@ -138,6 +302,15 @@ class Useful(commands.Cog):
         except Exception:
             await ctx.reply("API Error: Failed to fetch conversions.")
 
+    @cached(ttl=6 * 60 * 60)
+    async def get_latest_rates(self, cur_from: str) -> dict[str, float]:
+        async with self.bot.session.get(
+            "https://api.frankfurter.app/latest", params={"from": cur_from}
+        ) as r:
+            r.raise_for_status()
+            data = orjson.loads(await r.read())
+        return data["rates"]
+
     @commands.command(aliases=["colour"])
     async def color(self, ctx: commands.Context, *, colour: utils.BetterColour):
         """
@@ -151,19 +324,10 @@ class Useful(commands.Cog):
         `magenta`
         """
 
-        @utils.in_executor
-        def make_solid_colour(colour, as_hex):
-            buff = BytesIO()
-            im = Image.new("RGB", (250, 250), colour)
-            im.save(buff, "png")
-            buff.seek(0)
-            ret = discord.File(buff, f"{as_hex}.png")
-            return ret
-
         rgb = colour.to_rgb()
         as_hex_raw = hex(colour.value)
         as_hex = "#" + as_hex_raw[2:]
-        image = await make_solid_colour(rgb, as_hex_raw)
+        image = discord.File(BytesIO(solid_png(rgb)), f"{as_hex_raw}.png")
 
         if rgb == (255, 255, 255):
             colour = discord.Colour.from_rgb(254, 254, 254)
@@ -180,11 +344,7 @@ class Useful(commands.Cog):
         if not tz:
             time = pendulum.now(tz="UTC")
         else:
-            try:
-                tz = utils.COMMON_TIMEZONES[tz.lower()]
-            except Exception:
-                pass
-            tz = utils.fuzzy_search_one(tz, pendulum.timezones, cutoff=80)
+            tz = resolve_timezone(tz, cutoff=80)
             if tz:
                 time = pendulum.now(tz=tz)
             else:
@@ -217,42 +377,52 @@ class Useful(commands.Cog):
         `{prefix}tz 15:33 tokyo egypt warsaw`
         `{prefix}tz "2022-01-01 22:00" UTC MSK PT WIT`
         """
-        to_tzs = []
-
-        try:
-            from_tz = utils.COMMON_TIMEZONES[from_tz.lower()]
-        except Exception:
-            pass
+        if len(to_tz) >= 20:
+            raise ArtemisError("Woah there! That's too many time zones.")
 
-        from_tz = utils.fuzzy_search_one(from_tz, pendulum.timezones)
+        from_tz = resolve_timezone(from_tz)
 
         try:
             parsed_dt = pendulum.parse(time, tz=from_tz)
         except Exception:
             raise ArtemisError("Unable to parse the given time string.")
 
-        for tz in to_tz:
-            try:
-                tz = utils.COMMON_TIMEZONES[tz.lower()]
-            except Exception:
-                pass
-            curr_to_tz = utils.fuzzy_search_one(tz, pendulum.timezones)
-            to_tzs.append(curr_to_tz)
+        lines = [f"**{from_tz}**\n{parsed_dt.format('dddd[, ]HH:mm')}"]
+        for tz in map(resolve_timezone, to_tz):
+            lines.append(f"**{tz}**\n{parsed_dt.in_tz(tz).format('dddd[, ]HH:mm')}")
 
-        embed = discord.Embed(title="Time Zone Converter", colour=self.bot.pink)
-        embed.add_field(name=from_tz, value=parsed_dt.format("dddd[, ]HH:mm"))
+        if not to_tz:
+            lines.append(f"**Local time**\n{format_dt(parsed_dt.in_tz('UTC'), 't')}")
 
-        for tz in to_tzs:
-            converted_dt = parsed_dt.in_tz(tz)
-            embed.add_field(name=tz, value=converted_dt.format("dddd[, ]HH:mm"), inline=False)
+        embed = discord.Embed(
+            title="Time Zone Converter", description="\n\n".join(lines), colour=self.bot.pink
+        )
+        await ctx.reply(embed=embed)
 
-        if len(embed.fields) > 20:
-            raise ArtemisError("Woah there! That's too many time zones.")
+    @cached(ttl=10 * 60)
+    async def wikipedia_search(self, endpoint: str, query: str) -> list[str]:
+        headers = {"User-Agent": self.bot.real_user_agent}
+        async with self.bot.session.get(
+            WIKI_SEARCH.format(endpoint, quote(query)), headers=headers
+        ) as r:
+            data = orjson.loads(await r.read())
+        return data[1]
 
-        if not to_tz:
-            parsed_dt_utc = parsed_dt.in_tz("UTC")
-            embed.add_field(name="Local time", value=format_dt(parsed_dt_utc, "t"), inline=False)
-        await ctx.reply(embed=embed)
+    @cached(ttl=60 * 60)
+    async def wikipedia_extract(self, endpoint: str, title: str) -> dict | None:
+        headers = {"User-Agent": self.bot.real_user_agent}
+        async with self.bot.session.get(
+            WIKI_EXTRACT.format(endpoint, quote(title)), headers=headers
+        ) as r:
+            data = orjson.loads(await r.read())
+
+        pages = data["query"]["pages"]
+        if not pages:
+            return None
+
+        page = next(iter(pages.values()))
+        image = page.get("original")
+        return {"extract": page["extract"], "image_url": image and image.get("source") or None}
 
     @commands.command(aliases=["wiki"], usage="[lang:en] [l:en] <query>")
     async def wikipedia(self, ctx: commands.Context, *, flags: Optional[WikipediaFlags]):
@@ -276,57 +446,43 @@ class Useful(commands.Cog):
         if endpoint == "jp":
             endpoint = "ja"
 
-        API_BASE = f"https://{endpoint}.wikipedia.org/w/api.php"
-        WEB_BASE = f"https://{endpoint}.wikipedia.org/wiki/"
-        SEARCH = API_BASE + "?action=opensearch&format=json&redirects=resolve&search={}"
-        EXTRACT = (
-            API_BASE
-            + "?action=query&format=json&prop=extracts|pageimages&exintro&explaintext&exsentences=5&piprop=original&redirects=1&titles={}"
-        )
-        RANDOM = API_BASE + "?action=query&format=json&redirects=1&list=random&rnnamespace=0"
-        HEADERS = {"User-Agent": self.bot.real_user_agent}
+        page_url_base = f"https://{endpoint}.wikipedia.org/wiki/"
+        headers = {"User-Agent": self.bot.real_user_agent}
 
         await ctx.typing()
 
         try:
+            prefetch = None
             if query:
-                async with self.bot.session.get(SEARCH.format(quote(query)), headers=HEADERS) as r:
-                    data = await r.json()
-
-                titles = data[1]
+                titles = await self.wikipedia_search(endpoint, query)
                 if not titles:
                     return await ctx.reply("No results found.")
                 elif len(titles) == 1:
                     title = titles[0]
                 else:
+                    # fetch the top hit while the user is still picking
+                    prefetch = asyncio.create_task(self.wikipedia_extract(endpoint, titles[0]))
                     view = DropdownView(ctx, titles, lambda x: x)
                     result = await view.prompt("Which page?")
+                    if result != titles[0]:
+                        prefetch.cancel()
+                        prefetch = None
                     if not result:
                         return
                     title = result
             else:
-                async with self.bot.session.get(RANDOM, headers=HEADERS) as r:
-                    data = await r.json()
+                async with self.bot.session.get(WIKI_RANDOM.format(endpoint), headers=headers) as r:
+                    data = orjson.loads(await r.read())
 
                 page = data["query"]["random"][0]
                 title = page["title"]
 
-            async with self.bot.session.get(EXTRACT.format(quote(title)), headers=HEADERS) as r:
-                data = await r.json()
-
-            pages = data["query"]["pages"]
-            if not pages:
+            page = await (prefetch or self.wikipedia_extract(endpoint, title))
+            if not page:
                 return await ctx.reply("Title mismatch, action=query returned no pages.")
 
-            page = pages[list(pages)[0]]
-            extract = page["extract"]
-            page_url = WEB_BASE + quote(title)
-
-            image = page.get("original")
-            if image:
-                image_url = image.get("source") or None
-            else:
-                image_url = None
+            extract, image_url = page["extract"], page["image_url"]
+            page_url = page_url_base + quote(title)
 
             embed = discord.Embed(
                 title=title, description=utils.trim(extract, 4096), url=page_url, colour=0xFEFEFE
@@ -342,12 +498,12 @@ class Useful(commands.Cog):
     @commands.command(aliases=["wttr"])
     async def weather(self, ctx: commands.Context, *, location: str):
         """Check the weather for given city/region/country."""
-        LOC_RE = re.compile(r"Location:\s*(.*?)\s*\[")
 
         await ctx.typing()
 
         url = f"https://wttr.in/{quote(location)}"
-        async with self.bot.session.get(f"{url}?T") as r:
+        # current conditions only, the forecast tables were never shown anyway
+        async with self.bot.session.get(f"{url}?T0") as r:
             if r.status == 404:
                 return await ctx.reply("Location not found.")
             data = await r.text()
@@ -356,8 +512,11 @@ class Useful(commands.Cog):
             return await ctx.reply(data.split("\n\n")[0])
 
         loc_res = LOC_RE.search(data)
-        loc = loc_res.group(1) if loc_res else ""
-        text = "\n".join(data.split("\n")[1:7])
+        if loc_res:
+            loc = loc_res.group(1)
+        else:
+            loc = data.split("\n", 1)[0].removeprefix("Weather report: ")
+        text = "\n".join(islice(data.splitlines(), 1, 7))
         wrapped = self.bot.codeblock(text, "py")
 
         embed = discord.Embed(title=loc, description=wrapped, url=url, color=0x7494D7)
@@ -375,22 +534,34 @@ class Useful(commands.Cog):
         elif ctx.message.attachments:
             url = ctx.message.attachments[0].url
 
-        endpoint = "http://api.qrserver.com/v1/read-qr-code"
-        params = {"fileurl": url}
+        text = None
 
         async with ctx.typing():
-            async with self.bot.session.get(endpoint, params=params) as r:
-                json = await r.json()
-
-        result = json[0]["symbol"][0]
-        text = result["data"]
-        error = result["error"]
-
-        if error:
-            if "could not find" in error:
-                return await ctx.reply("Could not find/read a QR code.")
-            else:
-                return await ctx.reply(f"API ERROR: {error}")
+            if zbar_decode:
+                # any local failure, including fetching the image, falls back to the API
+                try:
+                    image = await utils.get_file_from_attachment_or_url(ctx, ctx.message, url)
+                    text = await decode_qr(image)
+                except Exception:
+                    pass
+
+            # fall back to the API for anything zbar couldn't read
+            if text is None:
+                endpoint = "http://api.qrserver.com/v1/read-qr-code"
+                params = {"fileurl": url}
+
+                async with self.bot.session.get(endpoint, params=params) as r:
+                    data = orjson.loads(await r.read())
+
+                result = data[0]["symbol"][0]
+                text = result["data"]
+                error = result["error"]
+
+                if error:
+                    if "could not find" in error:
+                        return await ctx.reply("Could not find/read a QR code.")
+                    else:
+                        return await ctx.reply(f"API ERROR: {error}")
 
         if len(text) > 2000:
             await ctx.reply(file=discord.File(StringIO(text), "decoded_QR_code.txt"))
@@ -400,16 +571,16 @@ class Useful(commands.Cog):
     async def get_lyngsat_cse_url(self):
         headers = {"User-Agent": self.bot.user_agent}
 
-        async with self.bot.session.get(
+        async with self.bot.session_for("cse.google.com").get(
             "https://cse.google.com/cse.js?cx=009961667831609082040:rhpc-bbbuim", headers=headers
         ) as r:
             data = await r.text()
 
-        cse_token = re.search(r"\"cse_token\":\s*\"(.*?)\"", data)
+        cse_token = CSE_TOKEN_RE.search(data)
         if not cse_token:
             raise ArtemisError("Invalid CSE data, missing `cse_token`.")
 
-        cselibv = re.search(r"\"cselibVersion\":\s*\"(.*?)\"", data)
+        cselibv = CSELIBV_RE.search(data)
         if not cselibv:
             raise ArtemisError("Invalid CSE data, missing `cselibVersion`.")
 
@@ -448,16 +619,22 @@ class Useful(commands.Cog):
         cse_url = await self.get_lyngsat_cse_url()
         cse_url += f"&q={query}&oq={query}"
 
-        async with self.bot.session.get(cse_url, headers=headers) as r:
-            if not r.ok:
-                raise ArtemisError(f"LyngSat CSE returned error: {r.status} {r.reason}")
-            data = await r.text()
-
-        data = re.search(r"\"results\":\s*(\[.*?\]),", data, re.S)
+        try:
+            async with asyncio.timeout(LYNGSAT_TIMEOUT):
+                async with self.bot.session_for("cse.google.com").get(
+                    cse_url, headers=headers
+                ) as r:
+                    if not r.ok:
+                        raise ArtemisError(f"LyngSat CSE returned error: {r.status} {r.reason}")
+                    data = await r.text()
+        except TimeoutError:
+            raise ArtemisError("LyngSat CSE took too long to respond.")
+
+        data = CSE_RESULTS_RE.search(data)
         if not data:
             raise ArtemisError("LyngSat CSE returned invalid data.")
 
-        data = json.loads(data.group(1))
+        data = orjson.loads(data.group(1))
         items = [
             item for item in data if "tvchannels" in item["url"] and r"%26sa%3DU" not in item["url"]
         ]
@@ -478,50 +655,32 @@ class Useful(commands.Cog):
                 return
             await ctx.typing()
 
-        lyngsat_url = result["url"]
-        async with self.bot.session.get(lyngsat_url, headers=headers) as r:
-            html = await r.text()
-
-        soup = BeautifulSoup(html, "lxml")
-
-        channel = result["titleNoFormatting"].removesuffix(" - LyngSat")
+        async def fetch_html(url: str):
+            # lyngsat is hit several times in a row, keep its connections warm
+            session = self.bot.session_for(urlparse(url).hostname)
+            try:
+                async with asyncio.timeout(LYNGSAT_TIMEOUT):
+                    async with session.get(url, headers=headers) as r:
+                        return await r.text()
+            except TimeoutError:
+                raise ArtemisError("LyngSat took too long to respond.")
 
-        satellites_table = soup.find(string="Satellite")
-        satellites_table = satellites_table.find_parent("table")
+        lyngsat_url = result["url"]
+        html = await fetch_html(lyngsat_url)
 
-        satellites = satellites_table.select("tr")[2:-1]
-        satellites = [s for s in satellites if len(s.select("td")) >= 7]
+        channel = result["titleNoFormatting"].removesuffix(" - LyngSat").strip()
+        satellites = await parse_lyngsat_channel(html)
 
         if len(satellites) == 1:
             result = satellites[0]
         else:
-
-            def satellite_desc(s):
-                fields = s.select("td")
-                ret = []
-                video = fields[6]
-                lang = fields[7]
-                if video.text:
-                    for br in video.select("br"):
-                        br.replace_with(" ")
-                    ret.append(video.text)
-                if lang.text:
-                    for br in lang.select("br"):
-                        br.replace_with(" ")
-                    ret.append(lang.text.lower())
-                return ", ".join(ret) if ret else None
-
-            view = DropdownView(ctx, satellites, lambda x: x.select("td")[1].text, satellite_desc)
+            view = DropdownView(ctx, satellites, lambda x: x["name"], lambda x: x["desc"])
             result = await view.prompt("Which satellite?")
             if not result:
                 return
             await ctx.typing()
 
-        satellite_data = result.select("td")
-        satellite_pos = satellite_data[0].text.strip()
-        satellite_url = satellite_data[1].a["href"]
-
-        sat_pos = re.search(r"(\d{1,3}(?:\.\d)?).*?((?:E|W))", satellite_pos)
+        sat_pos = SAT_POS_RE.search(result["pos"])
         if not sat_pos:
             return await ctx.reply("Failed to find satellite position.", embed=advice_embed)
 
@@ -529,7 +688,7 @@ class Useful(commands.Cog):
         # sref Namespace
         ns = enigma2.build_namespace(float(pos), cardinal.upper())
 
-        packages = satellite_data[9].select("a")
+        packages = result["packages"]
 
         if not packages:
             return await ctx.reply(
@@ -539,33 +698,34 @@ class Useful(commands.Cog):
         elif len(packages) == 1:
             package = packages[0]
         else:
-            view = DropdownView(ctx, packages, lambda x: x.text)
+            view = DropdownView(ctx, packages, lambda x: x["name"])
             package = await view.prompt("Which provider?")
             if not package:
                 return
-            package = package
             await ctx.typing()
 
-        async with self.bot.session.get(satellite_url, headers=headers) as r:
-            html = await r.text()
-
-        soup = BeautifulSoup(html, "lxml")
-
-        cell = soup.find(string=package.text.strip())
-        if not cell:
+        # a failing fetch cancels its sibling instead of leaving it running
+        try:
+            async with asyncio.TaskGroup() as tg:
+                satellite_task = tg.create_task(fetch_html(result["url"]))
+                package_task = tg.create_task(fetch_html(package["url"]))
+        except ExceptionGroup as eg:
+            raise eg.exceptions[0] from None
+        satellite_html, package_html = satellite_task.result(), package_task.result()
+
+        onid_tid = await parse_lyngsat_satellite(satellite_html, package["name"])
+        if onid_tid is None:
             return await ctx.reply(
                 "Could not match provider name to the entries in the satellite's table.",
                 embed=advice_embed,
             )
-
-        onid_tid = cell.find_parent("td").find_next_siblings("td")[1].text.strip()
-        if not onid_tid:
+        elif not onid_tid:
             return await ctx.reply(
                 "Not enough data to recreate a ServiceReference (missing ONID-TID).",
                 embed=advice_embed,
             )
 
-        onid_tid = re.search(r"(\d+)-(\d+)", onid_tid)
+        onid_tid = ONID_TID_RE.search(onid_tid)
         if not onid_tid:
             return await ctx.reply(
                 "Not enough data to recreate a ServiceReference (invalid ONID-TID).",
@@ -574,24 +734,19 @@ class Useful(commands.Cog):
 
         onid, package_tid = onid_tid.groups()
 
-        async with self.bot.session.get(package["href"], headers=headers) as r:
-            html = await r.text()
-
-        soup = BeautifulSoup(html, "lxml")
+        channel_data = await parse_lyngsat_package(package_html, channel)
+        if not channel_data:
+            return await ctx.reply(
+                "Could not find the channel in the provider's table.", embed=advice_embed
+            )
 
-        cell = soup.find(string=channel.strip())
-        parent = cell.find_parent("td")
-        siblings = parent.find_previous_siblings("td")
-        sid = siblings[2].text.strip()
+        sid, tid = channel_data
         if not sid:
             return await ctx.reply(
                 "Not enough data to recreate a ServiceReference (missing SID).", embed=advice_embed
             )
 
-        tid = parent.find_all_previous("td", rowspan=True)[1]
-        for br in tid.select("br"):
-            br.replace_with("\n")
-        tid = re.search(r"tp (\d+)", tid.text)
+        tid = TP_RE.search(tid)
 
         if not tid:
             is_guessed_tid = True
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import re
+from itertools import islice
 from typing import Any, Optional
 
 import discord
@@ -11,6 +12,10 @@ from .common import trim
 ANILIST_COLOR = 0x02A9FF
 FOOTER = "Powered by AniList APIv2"
 
+SPOILER_RE = re.compile(r"~!(.+?)!~", re.S)
+HEADING_RE = re.compile(r"^__.+(:__|__:|__.+:)|^\*\*.+(:\*\*|\*\*:|\*\*.+:)")
+HTML_TAG_RE = re.compile(r"<[^>]+>")
+
 media_formats_map = {
     "TV": "TV",
     "TV_SHORT": "TV Short",
@@ -39,31 +44,19 @@ def get_character_summary(character: Character) -> Optional[str]:
     if not get(character, "description"):
         return "No description available."
 
-    clean, spoilers = [], []
-    description = character.description
-
-    def repl(m):
-        spoilers.append(f"||{m.group(1)}||")
-        return ""
-
-    description = re.sub(r"~!(.+?)!~", repl, description, re.S)
-
-    lines = description.split("\n")
-    lines = [line for line in lines if line]
+    description = SPOILER_RE.sub("", character.description)
 
-    for line in lines:
-        if re.search(r"^__.+(:__|__:|__.+:)|^\*\*.+(:\*\*|\*\*:|\*\*.+:)", line):
-            continue
-        else:
-            clean.append(line.strip())
+    # only the first two clean lines are ever shown, stop scanning once we have them
+    lines = (line for line in description.split("\n") if line and not HEADING_RE.search(line))
+    clean = [line.strip() for line in islice(lines, 2)]
 
     if clean:
         ret = clean[0]
         if len(ret) < 100 and len(clean) > 1:
             ret += f"\n{clean[1]}"
         return trim(ret, 512)
-    elif spoilers:
-        return spoilers[0]
+    elif spoiler := SPOILER_RE.search(character.description):
+        return f"||{spoiler.group(1)}||"
     else:
         return "No description available."
 
@@ -71,7 +64,7 @@ def get_character_summary(character: Character) -> Optional[str]:
 def build_anilist_embed(result: Anime | Manga) -> discord.Embed:
     title = get(result.title, "english", result.title.romaji)
     description = result.description.split("<br>")[0] if get(result, "description") else ""
-    description = re.sub(r"<.+?>", "", description)
+    description = HTML_TAG_RE.sub("", description)
 
     source = result.source.replace("_", " ").title() if get(result, "source") else "N/A"
     status = result.status.replace("_", " ").title() if get(result, "status") else "N/A"
@@ -5,6 +5,8 @@ from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
 import aiohttp
+import orjson
+from yarl import URL
 
 from artemis.utils.common import ArtemisError
 
@@ -21,20 +23,21 @@ class YandexResult:
 
 class API:
     def __init__(self, bot: Artemis, base_url: str, token: str):
-        self.base_url = base_url
+        self.base_url = URL(base_url)
         self.token = token
         self.session: aiohttp.ClientSession = bot.session
         self.headers = {"User-Agent": bot.real_user_agent}
         self.authed_headers = {**self.headers, "Authorization": f"Bearer {self.token}"}
 
     async def yandex_ocr(self, image: bytes, mime: str):
-        base64_image = base64.b64encode(image).decode("utf-8")
-        data = {"file": base64_image, "mime": mime}
+        # the API takes base64 in a JSON body, serialize it with orjson in one pass
+        body = orjson.dumps({"file": base64.b64encode(image).decode("ascii"), "mime": mime})
+        headers = {**self.authed_headers, "Content-Type": "application/json"}
 
         async with self.session.post(
-            self.base_url + "/ocr/yandex", json=data, headers=self.authed_headers
+            self.base_url / "ocr/yandex", data=body, headers=headers
         ) as r:
-            data = await r.json()
+            data = orjson.loads(await r.read())
             if not r.ok:
                 raise ArtemisError(f"Yandex Error: {data.get('error', 'Unknown')}")
             result = YandexResult(**data)
@@ -36,9 +36,6 @@ class BoxBase:
         except asyncio.TimeoutError:
             raise CatboxError("Upload timed out.")
 
-    async def _aioread(self, fp) -> bytes:
-        return await asyncio.to_thread(fp.read)
-
 
 class Catbox(BoxBase):
     API_URL = "https://catbox.moe/user/api.php"
@@ -48,32 +45,23 @@ class Catbox(BoxBase):
         self.userhash = userhash or ""
 
     async def upload(self, resource: str | io.IOBase | os.PathLike, timeout: int | None = None):
-        fp = None
-        url = None
-        data = {}
-
         if isinstance(resource, str):
             if is_valid_url(resource):
-                url = resource
+                data = {"reqtype": "urlupload", "url": resource}
+                return await self._request(data, timeout=timeout)
             elif os.path.isfile(resource):
+                # aiohttp streams file objects in chunks and names the upload after the file
                 with open(resource, "rb") as f:
-                    name = f.name.split("/")[-1]
-                    fp = io.BytesIO(await self._aioread(f))
-                    fp.name = name
+                    data = {"reqtype": "fileupload", "fileToUpload": f}
+                    return await self._request(data, timeout=timeout)
             else:
                 raise CatboxError("Invalid file path or URL.")
         elif isinstance(resource, io.IOBase):
-            fp = resource
+            data = {"reqtype": "fileupload", "fileToUpload": resource}
+            return await self._request(data, timeout=timeout)
         else:
             raise CatboxError("Invalid file buffer, path or URL.")
 
-        if url:
-            data = {"reqtype": "urlupload", "url": url}
-        elif fp:
-            data = {"reqtype": "fileupload", "fileToUpload": fp}
-
-        return await self._request(data, timeout=timeout)
-
     async def delete(self, files: str, timeout: int | None = None):
         data = {"reqtype": "deletefiles", "files": files}
         return await self._request(data, timeout=timeout)
@@ -88,19 +76,17 @@ class Litterbox(BoxBase):
         if time not in (1, 12, 24, 72):
             raise CatboxError("Invalid expiration time.")
 
+        data = {"reqtype": "fileupload", "time": f"{time}h"}
+
         if isinstance(fp, str):
             if os.path.isfile(fp):
                 with open(fp, "rb") as f:
-                    name = f.name.split("/")[-1]
-                    fp = io.BytesIO(await self._aioread(f))
-                    fp.name = name
+                    data["fileToUpload"] = f
+                    return await self._request(data, timeout=timeout)
             else:
                 raise CatboxError("Invalid file path.")
         elif isinstance(fp, io.IOBase):
-            pass
+            data["fileToUpload"] = fp
+            return await self._request(data, timeout=timeout)
         else:
             raise CatboxError("Invalid file buffer.")
-
-        data = {"reqtype": "fileupload", "time": f"{time}h", "fileToUpload": fp}
-
-        return await self._request(data, timeout=timeout)
@@ -2,9 +2,10 @@ from __future__ import annotations
 
 import asyncio
 import functools
-import json
+import os
 import re
 import shlex
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from io import BytesIO
 from ipaddress import ip_address
@@ -14,7 +15,9 @@ from time import time as _time
 from typing import (
     TYPE_CHECKING,
     Any,
+    AsyncIterator,
     Callable,
+    Collection,
     Coroutine,
     Dict,
     List,
@@ -23,27 +26,47 @@ from typing import (
     Sequence,
     TypeVar,
 )
-from urllib.parse import quote_plus, urlparse
+from urllib.parse import ParseResult, quote_plus, urlparse
 import tomllib
 
+import aiohttp
 import discord
 import humanize
+import orjson
 import pendulum
 import pykakasi
 from aiohttp.helpers import is_ip_address
 from discord.ext import commands
-import feedparser
-from rapidfuzz import process
+from lxml import etree
+from rapidfuzz import fuzz, process
 from PIL import Image
 
-from .. import utils
+from .constants import COMMON_COLOURS, MAX_DISCORD_SIZE
 
 if TYPE_CHECKING:
     from ..bot import Artemis
 
 
+RSS_PARSER = etree.XMLParser(recover=True, resolve_entities=False, no_network=True)
+
 # url regex
-URL_RE = r"(?i)\b((?:https?://|www\d{0,3}[.]|[a-z0-9.\-]+[.][a-z]{2,4}/)(?:[^\s()<>]+|\(([^\s()<>]+|(\([^\s()<>]+\)))*\))+(?:\(([^\s()<>]+|(\([^\s()<>]+\)))*\)|[^\s`!()\[\]{};:'\".,<>?«»“”‘’]))"
+URL_RE = re.compile(
+    r"(?i)\b(?:https?://|www\d{0,3}[.]|[a-z0-9.\-]+[.][a-z]{2,4}/)(?:[^\s()<>]|\((?:[^\s()<>]|\([^\s()<>]*\))*\))+(?:\((?:[^\s()<>]|\([^\s()<>]*\))*\)|[^\s`!()\[\]{};:'\".,<>?«»“”‘’])"
+)
+LATIN_RE = re.compile(r"[a-zA-Z]")
+KAKASI = pykakasi.kakasi()
+COLOUR_NAMES = list(COMMON_COLOURS)
+SHORT_TIME_RE = re.compile(
+    """(?:(?P<years>[0-9])(?:years?|y))?              # e.g. 2y
+       (?:(?P<months>[0-9]{1,2})(?:months?|mo))?     # e.g. 2months
+       (?:(?P<weeks>[0-9]{1,4})(?:weeks?|w))?        # e.g. 10w
+       (?:(?P<days>[0-9]{1,5})(?:days?|d))?          # e.g. 14d
+       (?:(?P<hours>[0-9]{1,5})(?:hours?|h))?        # e.g. 12h
+       (?:(?P<minutes>[0-9]{1,5})(?:minutes?|m))?    # e.g. 10m
+       (?:(?P<seconds>[0-9]{1,5})(?:seconds?|s))?    # e.g. 15s
+    """,
+    re.VERBOSE,
+)
 
 
 class ArtemisError(commands.CommandError):
@@ -68,10 +91,10 @@ class InvalidColour(commands.BadArgument):
 
 class BetterColour(commands.Converter):
     async def convert(self, _ctx, argument: str):
-        colour_name = fuzzy_search_one(argument, list(utils.COMMON_COLOURS), cutoff=60)
+        colour_name = fuzzy_search_one(argument, COLOUR_NAMES, cutoff=60)
         if not colour_name:
             raise InvalidColour("Invalid colour code/name.")
-        argument = utils.COMMON_COLOURS[colour_name]
+        argument = COMMON_COLOURS[colour_name]
         colour = discord.Colour.from_str(argument)
         return colour
 
@@ -81,9 +104,9 @@ class URL(commands.Converter):
 
     async def convert(self, _ctx, argument: str):
         argument = argument.strip("<>")
-        match = is_valid_url(argument)
-        if match:
-            check_for_ssrf(argument)
+        parsed = is_valid_url(argument)
+        if parsed:
+            check_for_ssrf(parsed)
             return argument
         else:
             raise InvalidURL("That doesn't look like a valid URL.")
@@ -126,6 +149,7 @@ class ProgressBarMessage:
     _delete_on_finished = bool
     _finished = bool
     _finished_kwargs: dict
+    _changed: asyncio.Event
 
     def __init__(
         self,
@@ -148,6 +172,7 @@ class ProgressBarMessage:
         self._finished_kwargs = {"content": "Done!"}
         self._finished = False
         self._delete_on_finished = delete_on_finished
+        self._changed = asyncio.Event()
 
     def _get_fmt(self):
         fmt = None
@@ -167,7 +192,6 @@ class ProgressBarMessage:
     async def _render(self):
         try:
             while not self._finished:
-                print(vars(self))
                 content = ""
                 if self._prefix:
                     content += self._prefix + "\n"
@@ -178,7 +202,10 @@ class ProgressBarMessage:
                 else:
                     self._msg = await self._msg.edit(content=content)
 
+                # rate limit the edits, then only wake up again when there's something new
                 await asyncio.sleep(1 / self._refresh_rate)
+                await self._changed.wait()
+                self._changed.clear()
 
             if self._msg:
                 if self._delete_on_finished:
@@ -208,20 +235,25 @@ class ProgressBarMessage:
 
     def set(self, val: int):
         self._current = val
+        self._changed.set()
 
     def set_total(self, val: int):
         self._total = val
+        self._changed.set()
 
     def set_prefix(self, prefix: str):
         self._prefix = prefix
+        self._changed.set()
 
     def increment(self, val: int):
         self._current += val
+        self._changed.set()
 
     def finish(self, **kwargs):
         self._finished = True
         if kwargs:
             self._finished_kwargs = kwargs
+        self._changed.set()
 
     def set_finished_kwargs(self, **kwargs):
         self._finished_kwargs = kwargs
@@ -241,7 +273,7 @@ def file(fp: bytes | str | list | dict, filename: str):
     elif isinstance(fp, str):
         buf = BytesIO(fp.encode("utf-8"))
     elif isinstance(fp, (list, dict)):
-        buf = BytesIO(json.dumps(fp, indent=2, ensure_ascii=False).encode("utf-8"))
+        buf = BytesIO(orjson.dumps(fp, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
     else:
         raise TypeError("Invalid file pointer input.")
 
@@ -249,19 +281,19 @@ def file(fp: bytes | str | list | dict, filename: str):
     return discord.File(buf, filename)
 
 
-def read_text(path: str) -> str:
+def read_text(path: str | os.PathLike) -> str:
     with open(path, "r") as f:
         return f.read()
 
 
-def read_bytes(path: str) -> bytes:
+def read_bytes(path: str | os.PathLike) -> bytes:
     with open(path, "rb") as f:
         return f.read()
 
 
-def read_json(path: str) -> Any:
-    with open(path, "r") as f:
-        return json.load(f)
+def read_json(path: str | os.PathLike) -> Any:
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
 
 
 def read_toml(path: str) -> Any:
@@ -282,6 +314,10 @@ def in_executor(func: Callable[..., T]) -> Callable[..., Coroutine[Any, Any, T]]
     return decorator
 
 
+# non-blocking variant for use inside coroutines, the sync one is fine at import time
+aread_text = in_executor(read_text)
+
+
 def time(resolution: Literal["s", "ms", "ns"] = "s") -> int:
     """
     Return the current time in resolution since the unix epoch as an int.
@@ -303,7 +339,9 @@ def trim(text: Optional[str], max_len: int) -> Optional[str]:
     """Trims text to specified max length."""
     if text is None:
         return None
-    return f"{text[:max_len - 3]}..." if len(text) > max_len else text
+    if len(text) <= max_len:
+        return text
+    return text[: max_len - 3] + "..."
 
 
 def romajify(text: str, strict: bool = True) -> str:
@@ -311,27 +349,25 @@ def romajify(text: str, strict: bool = True) -> str:
     Romajifies all Japanese characters.
     If strict, text containing any English characters won't be converted.
     """
-    if strict and re.search(r"[a-zA-Z]", text):
+    if strict and LATIN_RE.search(text):
         return text
-    kana = pykakasi.kakasi().convert(text)
-    romaji = "".join([group["hepburn"] + " " for group in kana])
-    return romaji.strip()
+    kana = KAKASI.convert(text)
+    return " ".join(group["hepburn"] for group in kana).strip()
 
 
-def is_valid_url(url: str) -> bool:
+def is_valid_url(url: str) -> ParseResult | None:
+    """Returns the parsed URL if it's a valid http(s) URL, otherwise None."""
     parsed = urlparse(url)
-    if (
-        not parsed.scheme
-        or not parsed.netloc
-        or not (parsed.scheme.startswith("http") and "." in parsed.netloc)
-    ):
-        return False
-    return True
+    if parsed.scheme not in ("http", "https") or "." not in parsed.netloc:
+        return None
+    return parsed
 
 
-def check_for_ssrf(url: str):
+def check_for_ssrf(url: str | ParseResult):
     """Checks if the provided url contains private IP addresses."""
-    hostname = urlparse(url).hostname
+    if isinstance(url, str):
+        url = urlparse(url)
+    hostname = url.hostname
     if (
         hostname
         and hostname == "localhost"
@@ -343,23 +379,18 @@ def check_for_ssrf(url: str):
 
 def silence_url_embeds(message: str) -> str:
     """Silences link embeds in a message we send."""
-    regex = re.compile(URL_RE)
 
     def repl(m):
         url = m.group(0)
         return f"<{url}>"
 
-    ret = regex.sub(repl, str(message))
+    ret = URL_RE.sub(repl, str(message))
     return ret
 
 
 def make_pages(data: List[Dict | Any], per_page: int = 5) -> List[List]:
     """Turn a list of items into pages."""
-    pages = []
-    while data:
-        pages.append(data[:per_page])
-        data = data[per_page:]
-    return pages
+    return [data[i : i + per_page] for i in range(0, len(data), per_page)]
 
 
 def make_embeds(
@@ -401,42 +432,96 @@ class CommandResult:
         return self.returncode == 0
 
 
-async def run_cmd(args: str, shell=False, input=None) -> CommandResult:
-    """Runs a shell command and returns raw/formatted output."""
-    stdin = PIPE if input else None
+async def create_subprocess(
+    args: str | list[str], shell=False, stdin: int | None = None
+) -> asyncio.subprocess.Process:
+    """Spawns a command with piped output, argv lists skip shell-style splitting entirely."""
+    if shell:
+        return await asyncio.create_subprocess_shell(args, stdout=PIPE, stderr=PIPE, stdin=stdin)
+    split_args = shlex.split(args) if isinstance(args, str) else args
+    return await asyncio.create_subprocess_exec(*split_args, stdout=PIPE, stderr=PIPE, stdin=stdin)
+
+
+async def run_cmd(
+    args: str | list[str], shell=False, input=None, timeout: float | None = None
+) -> CommandResult:
+    """
+    Runs a shell command and returns raw/formatted output.
+    Pass an argv list to skip shell-style splitting and quoting entirely.
+    The command is killed if it doesn't finish within `timeout` seconds.
+    """
     try:
-        if shell:
-            subprocess = await asyncio.create_subprocess_shell(
-                args, stdout=PIPE, stderr=PIPE, stdin=stdin
-            )
-        else:
-            split_args = shlex.split(args)
-            subprocess = await asyncio.create_subprocess_exec(
-                *split_args, stdout=PIPE, stderr=PIPE, stdin=stdin
-            )
+        subprocess = await create_subprocess(args, shell, PIPE if input else None)
+    except Exception as err:
+        raise CommandExecutionError(err) from err
+
+    try:
+        async with asyncio.timeout(timeout):
+            stdout, stderr = await subprocess.communicate(input=input)
+    except TimeoutError:
+        subprocess.kill()
+        await subprocess.wait()
+        raise CommandExecutionError("The command timed out.")
+    except Exception as err:
+        raise CommandExecutionError(err) from err
+
+    return CommandResult(stdout, stderr, subprocess.returncode)
+
 
-        stdout, stderr = await subprocess.communicate(input=input)
+async def stream_to_cmd(args: str | list[str], stream: aiohttp.StreamReader) -> CommandResult:
+    """Runs a command with a response body streamed into its stdin as it downloads."""
+    try:
+        subprocess = await create_subprocess(args, stdin=PIPE)
+
+        async def feed():
+            try:
+                async for chunk in stream.iter_chunked(65536):
+                    subprocess.stdin.write(chunk)
+                    await subprocess.stdin.drain()
+            except (BrokenPipeError, ConnectionResetError):
+                # the command exited early, its output tells why
+                pass
+            finally:
+                subprocess.stdin.close()
+
+        _, stdout, stderr = await asyncio.gather(
+            feed(), subprocess.stdout.read(), subprocess.stderr.read()
+        )
+        await subprocess.wait()
     except Exception as err:
         raise CommandExecutionError(err) from err
 
     return CommandResult(stdout, stderr, subprocess.returncode)
 
 
-async def run_cmd_to_file(args: str, filename: str, shell=False) -> discord.File | str:
+async def run_cmd_to_file(args: str | list[str], filename: str, shell=False) -> discord.File | str:
     """Runs a shell command and returns the output as a discord.File."""
-    result = await run_cmd(args, shell=shell)
-    stdout, stderr = result.stdout, result.stderr
+    try:
+        subprocess = await create_subprocess(args, shell)
+    except Exception as err:
+        raise CommandExecutionError(err) from err
 
-    if not result.ok:
-        raise CommandExecutionError(stderr.decode())
+    fp = BytesIO()
 
-    fp = BytesIO(stdout)
-    fp.seek(0)
+    async def read_stdout() -> bool:
+        # write straight into the upload buffer and bail out as soon as it can't be sent
+        while chunk := await subprocess.stdout.read(65536):
+            fp.write(chunk)
+            if fp.tell() > MAX_DISCORD_SIZE:
+                subprocess.kill()
+                return False
+        return True
 
-    if len(stdout) <= 25 * 1024**2:
-        return discord.File(fp, filename)
-    else:
+    fits, stderr = await asyncio.gather(read_stdout(), subprocess.stderr.read())
+    await subprocess.wait()
+
+    if not fits:
         raise CommandExecutionError("The file is too big to upload.")
+    if subprocess.returncode != 0:
+        raise CommandExecutionError(stderr.decode())
+
+    fp.seek(0)
+    return discord.File(fp, filename)
 
 
 @in_executor
@@ -460,23 +545,12 @@ def compress_image(
 
 
 def parse_short_time(time_string: str, as_duration: bool = False):
-    compiled = re.compile(
-        """(?:(?P<years>[0-9])(?:years?|y))?              # e.g. 2y
-            (?:(?P<months>[0-9]{1,2})(?:months?|mo))?     # e.g. 2months
-            (?:(?P<weeks>[0-9]{1,4})(?:weeks?|w))?        # e.g. 10w
-            (?:(?P<days>[0-9]{1,5})(?:days?|d))?          # e.g. 14d
-            (?:(?P<hours>[0-9]{1,5})(?:hours?|h))?        # e.g. 12h
-            (?:(?P<minutes>[0-9]{1,5})(?:minutes?|m))?    # e.g. 10m
-            (?:(?P<seconds>[0-9]{1,5})(?:seconds?|s))?    # e.g. 15s
-        """,
-        re.VERBOSE,
-    )
-
-    match = compiled.fullmatch(time_string)
+    match = SHORT_TIME_RE.fullmatch(time_string)
     if match is None or not match.group(0):
         raise commands.BadArgument("Invalid time provided.")
 
-    data = {k: int(v) for k, v in match.groupdict(default=0).items()}
+    # unmatched units are left out, pendulum defaults them to zero
+    data = {k: int(v) for k, v in match.groupdict().items() if v is not None}
     if as_duration:
         return pendulum.duration(**data)
     return pendulum.now("UTC") + pendulum.duration(**data)
@@ -485,14 +559,14 @@ def parse_short_time(time_string: str, as_duration: bool = False):
 def extract_urls(s: str | None):
     if not s:
         return []
-    return re.findall(URL_RE, s)
+    return URL_RE.findall(s)
 
 
 def extract_first_url(s: str | None) -> Optional[str]:
-    url = next(iter(extract_urls(s)), None)
-    if not url:
+    if not s:
         return None
-    return url[0]
+    match = URL_RE.search(s)
+    return match.group(0) if match else None
 
 
 async def get_reply(ctx: commands.Context[Artemis]) -> discord.Message | None:
@@ -505,9 +579,13 @@ async def get_reply(ctx: commands.Context[Artemis]) -> discord.Message | None:
         return None
 
 
-async def get_file_from_attachment_or_url(
-    ctx: commands.Context[Artemis], message: discord.Message, url: Optional[str], types: list = None
-) -> bytes:
+def get_source_from_attachment_or_url(
+    ctx: commands.Context[Artemis],
+    message: discord.Message,
+    url: Optional[str],
+    types: Collection[str] | None = None,
+) -> discord.Attachment | str:
+    """Validates and returns the attachment or URL a file should be read from."""
     is_replied_to = ctx.message is not message
 
     if not message.attachments and not url and (is_replied_to and not message.content):
@@ -519,9 +597,9 @@ async def get_file_from_attachment_or_url(
                 raise ArtemisError("Cannot guess file content type.")
             elif attachment.content_type not in types:
                 raise ArtemisError(
-                    f"Unsupported file type, should be one of: `{', '.join(types)}`."
+                    f"Unsupported file type, should be one of: `{', '.join(sorted(types))}`."
                 )
-        return await attachment.read()
+        return attachment
     elif url or (is_replied_to and message.content):
         if is_replied_to:
             url = extract_first_url(message.content)
@@ -529,26 +607,53 @@ async def get_file_from_attachment_or_url(
                 raise ArtemisError("No URL found in message.")
 
         url = url.strip("<>")
-        if not is_valid_url(url):
+        parsed = is_valid_url(url)
+        if not parsed:
             raise ArtemisError("URL is not valid.")
-        utils.check_for_ssrf(url)
+        check_for_ssrf(parsed)
+        return url
+    else:
+        raise ArtemisError("Unreachable code.")
+
+
+@asynccontextmanager
+async def open_url(
+    ctx: commands.Context[Artemis], url: str, types: Collection[str] | None = None
+) -> AsyncIterator[aiohttp.ClientResponse]:
+    """Opens a user supplied URL and checks its status and content type, yields the response."""
+    headers = {"User-Agent": ctx.bot.user_agent}
+    try:
+        r = await ctx.bot.session.get(url, headers=headers)
+    except Exception as err:
+        raise ArtemisError("An error occured when trying to connect to the given URL.") from err
+
+    async with r:
+        if not r.ok:
+            raise ArtemisError(f"URL returned error status {r.status}")
+        if types:
+            if not r.content_type:
+                if "discord" not in url:
+                    raise ArtemisError("Cannot guess file content type.")
+            elif r.content_type not in types:
+                raise ArtemisError("Unsupported file type, should be an image.")
+        yield r
+
+
+async def get_file_from_attachment_or_url(
+    ctx: commands.Context[Artemis],
+    message: discord.Message,
+    url: Optional[str],
+    types: Collection[str] | None = None,
+) -> bytes:
+    source = get_source_from_attachment_or_url(ctx, message, url, types)
+    if isinstance(source, discord.Attachment):
+        return await source.read()
 
-        headers = {"User-Agent": ctx.bot.user_agent}
+    async with open_url(ctx, source, types) as r:
         try:
-            async with ctx.bot.session.get(url, headers=headers) as r:
-                if not r.ok:
-                    raise ArtemisError(f"URL returned error status {r.status}")
-                if types:
-                    if not r.content_type:
-                        if "discord" not in url:
-                            raise ArtemisError("Cannot guess file content type.")
-                    elif r.content_type not in types:
-                        raise ArtemisError("Unsupported file type, should be an image.")
-                return await r.read()
-        except BaseException as err:
+            return await r.read()
+        except Exception as err:
             raise ArtemisError("An error occured when trying to connect to the given URL.") from err
-    else:
-        raise ArtemisError("Unreachable code.")
 
 
 T = TypeVar("T", str, dict)
@@ -565,14 +670,19 @@ def fuzzy_search(
     if isinstance(choices[0], str):
         return [
             result[0]
-            for result in process.extract(query.lower(), choices, score_cutoff=cutoff, limit=limit)
+            for result in process.extract(
+                query.lower(), choices, scorer=fuzz.WRatio, score_cutoff=cutoff, limit=limit
+            )
         ]
 
     if not key:
         raise KeyError("'key' is required for dictionary search")
-    lookup = {entry[key]: entry for entry in choices}
-    results = process.extract(query.lower(), lookup.keys(), score_cutoff=cutoff, limit=limit)
-    return [lookup[result[0]] for result in results]
+    # extract returns the index of each match, map it straight back to the entry
+    names = [entry[key] for entry in choices]
+    results = process.extract(
+        query.lower(), names, scorer=fuzz.WRatio, score_cutoff=cutoff, limit=limit
+    )
+    return [choices[index] for _, _, index in results]
 
 
 def fuzzy_search_one(
@@ -605,9 +715,13 @@ async def search_bing(
     async with ctx.bot.session.get(url, headers=headers) as r:
         if not r.ok:
             raise ArtemisError(f"Bing returned {r.status} {r.reason}")
-        rss = await r.text()
+        rss = await r.read()
 
-    feed = feedparser.parse(rss)
-    entries = feed.entries
-
-    return [BingResult(entry["link"], entry["title"], entry["summary"]) for entry in entries]
+    # the feed is tiny and only three fields are needed, lxml parses it in C
+    root = etree.fromstring(rss, RSS_PARSER)
+    if root is None:
+        return []
+    return [
+        BingResult(item.findtext("link"), item.findtext("title"), item.findtext("description"))
+        for item in root.iterfind("channel/item")
+    ]
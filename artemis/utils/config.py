@@ -1,5 +1,6 @@
 import os
 from dataclasses import dataclass
+from functools import cache
 
 from .common import read_toml
 
@@ -30,8 +31,9 @@ class Config:
         self.secrets = Secrets(**self.secrets)
 
 
-def load_config() -> Config:
-    if os.getenv("ENV") == "production":
+@cache
+def load_config_for(env: str | None) -> Config:
+    if env == "production":
         values = read_toml("config.prod.toml")
     else:
         values = read_toml("config.dev.toml")
@@ -39,4 +41,8 @@ def load_config() -> Config:
     return Config(**values)
 
 
+def load_config() -> Config:
+    return load_config_for(os.getenv("ENV"))
+
+
 config = load_config()
@@ -1,6 +1,5 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from functools import cached_property
 from typing import TYPE_CHECKING
 import httpx
 
@@ -33,6 +32,37 @@ class DeepL:
     api_key: str
     headers: dict[str, str]
     over_quota: bool = False
+    languages: dict[str, str] = {
+        "bg": "Bulgarian",
+        "cs": "Czech",
+        "da": "Danish",
+        "de": "German",
+        "el": "Greek",
+        "en": "English",
+        "es": "Spanish",
+        "et": "Estonian",
+        "fi": "Finnish",
+        "fr": "French",
+        "hu": "Hungarian",
+        "id": "Indonesian",
+        "it": "Italian",
+        "ja": "Japanese",
+        "ko": "Korean",
+        "lt": "Lithuanian",
+        "lv": "Latvian",
+        "nb": "Norwegian",
+        "nl": "Dutch",
+        "pl": "Polish",
+        "pt": "Portuguese",
+        "ro": "Romanian",
+        "ru": "Russian",
+        "sk": "Slovak",
+        "sl": "Slovenian",
+        "sv": "Swedish",
+        "tr": "Turkish",
+        "uk": "Ukrainian",
+        "zh": "Chinese",
+    }
 
     def __init__(self, bot: Artemis, api_key: str):
         self.session = bot.httpx_session
@@ -85,37 +115,3 @@ class DeepL:
 
         data = r.json()
         return Usage(**data)
-
-    @cached_property
-    def languages(self):
-        return {
-            "bg": "Bulgarian",
-            "cs": "Czech",
-            "da": "Danish",
-            "de": "German",
-            "el": "Greek",
-            "en": "English",
-            "es": "Spanish",
-            "et": "Estonian",
-            "fi": "Finnish",
-            "fr": "French",
-            "hu": "Hungarian",
-            "id": "Indonesian",
-            "it": "Italian",
-            "ja": "Japanese",
-            "ko": "Korean",
-            "lt": "Lithuanian",
-            "lv": "Latvian",
-            "nb": "Norwegian",
-            "nl": "Dutch",
-            "pl": "Polish",
-            "pt": "Portuguese",
-            "ro": "Romanian",
-            "ru": "Russian",
-            "sk": "Slovak",
-            "sl": "Slovenian",
-            "sv": "Swedish",
-            "tr": "Turkish",
-            "uk": "Ukrainian",
-            "zh": "Chinese",
-        }
@@ -1,4 +1,5 @@
 from enum import IntEnum
+from functools import lru_cache
 from typing import Literal
 
 # https://github.com/openatv/enigma2/blob/a0979a6091df64d9f1e7283fa9bd40ca3f64d9d8/doc/SERVICEREF#L131
@@ -24,6 +25,7 @@ class Namespace(IntEnum):
 SREF_FMT = "1:0:{:x}:{:x}:{:x}:{:x}:{:x}:0:0:0:"
 
 # 3600 - west_sat_position
+@lru_cache(maxsize=256)
 def build_namespace(pos: float, cardinal: Literal["E", "W"]) -> int:
     pos = int(pos * 10)
     if cardinal == "W":
@@ -40,6 +42,7 @@ def pos_from_namespace(ns: int) -> str:
 
 # REFTYPE:FLAGS:STYPE:SID:TSID:ONID:NS:PARENT_SID:PARENT_TSID:UNUSED:PATH:NAME
 # we only care about DVB here
+@lru_cache(maxsize=256)
 def build_sref(service_type, sid, tsid, onid, ns):
     return SREF_FMT.format(service_type, sid, tsid, onid, ns).upper()
 
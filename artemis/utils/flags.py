@@ -9,6 +9,8 @@ class _PosArgSentinel:
 
 PosArgument = _PosArgSentinel
 
+POS_ARGUMENT_STRIP_RE = re.compile(r"[a-zA-Z]+:[^\s\/]+")
+
 
 class Flags:
     def __init__(self, **kwargs):
@@ -25,23 +27,33 @@ class Flags:
 class FlagConverter(commands.Converter):
     """Custom command flags converter and parser."""
 
+    # flag name -> compiled pattern, or None for the positional argument
+    patterns = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # compile each flag's pattern once per subclass instead of on every invocation
+        cls.patterns = {
+            name: (
+                None
+                if type is PosArgument
+                else re.compile(rf"(\b{name}|\b{name[0]}):(?P<value>[^\s\/]+)\b")
+            )
+            for name, type in cls.__dict__.get("__annotations__", {}).items()
+        }
+
     async def convert(self, ctx: commands.Context, argument: str):
-        flags = self.__class__.__annotations__
-        if not flags:
+        if not self.patterns:
             raise ValueError("No flags provided.")
 
         parsed_flags = {}
-        for name, type in flags.items():
-            if type is PosArgument:
-                value = re.sub(r"[a-zA-Z]+:[^\s\/]+", "", argument)
+        for name, pattern in self.patterns.items():
+            if pattern is None:
+                value = POS_ARGUMENT_STRIP_RE.sub("", argument)
                 parsed_flags[name] = value.strip()
             else:
-                m = re.search(rf"(\b{name}|\b{name[0]}):(?P<value>[^\s\/]+)\b", argument)
-                if m:
-                    value = m.group("value")
-                    parsed_flags[name] = value
-                else:
-                    parsed_flags[name] = None
+                m = pattern.search(argument)
+                parsed_flags[name] = m.group("value") if m else None
         return Flags(**parsed_flags)
 
 
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 import json
-import re
 from csv import DictReader
 from io import StringIO
 from typing import TYPE_CHECKING, Literal, TypedDict
 
-from .common import fuzzy_search, read_json
+from rapidfuzz import process
+
+from .common import read_json
 
 if TYPE_CHECKING:
     from ..bot import Artemis
@@ -36,61 +37,81 @@ class CodeResult(TypedDict):
 SearchMethod = Literal["fuzzy", "strict-start", "strict"]
 
 
-iso_639_1: list[Language] = []
-iso_639_2b: list[Language] = []
 iso_639_3: list[Language] = []
 
+# code -> entry across part1, part2b and id, name.casefold() -> entries
+_by_code: dict[str, Language] = {}
+_by_name: dict[str, list[Language]] = {}
+_names: list[str] = []  # casefolded, parallel to iso_639_3
+# fuzzy choices skip one and two letter names, WRatio's partial matching would let "e" or "u"
+# clear the cutoff for any query containing that letter, exact lookups still find them
+_fuzzy_names: list[str] = []
+_fuzzy_entries: list[Language] = []
+
+
+def _index(entries: list[Language]):
+    _by_code.clear()
+    _by_name.clear()
+    _names[:] = [entry["name"].casefold() for entry in entries]
+    _fuzzy_entries[:] = [entry for entry in entries if len(entry["name"]) >= 3]
+    _fuzzy_names[:] = [entry["name"].casefold() for entry in _fuzzy_entries]
+
+    # ids take precedence over part2b codes, first entry wins otherwise
+    for entry in entries:
+        _by_code.setdefault(entry["id"], entry)
+    for entry in entries:
+        for key in ("part2b", "part1"):
+            if entry[key]:
+                _by_code.setdefault(entry[key], entry)
+        _by_name.setdefault(entry["name"].casefold(), []).append(entry)
+
+
 try:
     iso_639_3 = read_json("data/iso_639_3.json")
-
-    iso_639_1 = [entry for entry in iso_639_3 if entry["part1"]]
-    iso_639_2b = [entry for entry in iso_639_3 if entry["part2b"]]
+    _index(iso_639_3)
 except FileNotFoundError:
     pass
 
 
-def _find_entry(seq: list[Language], lookup_key: str, query: str) -> Language | None:
-    return next((entry for entry in seq if entry[lookup_key] == query), None)
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _starts_with_word(text: str, prefix: str) -> bool:
+    """Like str.startswith, but the prefix also has to end on a word boundary."""
+    if not text.startswith(prefix):
+        return False
+    end = len(prefix)
+    after = end < len(text) and _is_word_char(text[end])
+    return _is_word_char(prefix[-1]) != after
 
 
 def get_language_name(code: str):
     code = code.strip().lower()
-    if not code:
+    if len(code) not in (2, 3):
         return None
 
-    found = None
-
-    # iso 639-1 alpha2 codes
-    if len(code) == 2:
-        found = _find_entry(iso_639_1, "part1", code)
-        if found:
-            found = found["name"]
-    # alpha3 codes
-    elif len(code) == 3:
-        # try iso-639-3 first
-        found = _find_entry(iso_639_3, "id", code)
-        if found:
-            found = found["name"]
-        else:
-            # try iso-639-2b
-            found = _find_entry(iso_639_2b, "part2b", code)
-            if found:
-                found = found["name"]
-
-    return found
+    found = _by_code.get(code)
+    return found["name"] if found else None
 
 
 def get_language_code(name: str, method: SearchMethod = "fuzzy") -> list[CodeResult] | None:
-    name = name.strip().lower()
+    name = name.strip().casefold()
     if not name:
         return None
 
     if method == "fuzzy":
-        found = fuzzy_search(name, iso_639_3, "name", cutoff=80)
+        exact = _by_name.get(name, [])
+        fuzzy = [
+            _fuzzy_entries[idx]
+            for _, _, idx in process.extract(name, _fuzzy_names, score_cutoff=80, limit=5)
+        ]
+        # exact hits go first, the fuzzy ones still list variants like "Old English"
+        found = exact + [entry for entry in fuzzy if entry not in exact]
     elif method == "strict-start":
-        found = [entry for entry in iso_639_3 if re.search(rf"^{name}\b", entry["name"], re.I)]
+        found = [iso_639_3[idx] for idx, n in enumerate(_names) if _starts_with_word(n, name)]
     elif method == "strict":
-        found = [entry for entry in iso_639_3 if entry["name"].lower() == name]
+        found = _by_name.get(name)
 
     if not found:
         return None
@@ -135,4 +156,5 @@ async def build(bot: Artemis):
 
     global iso_639_3
     iso_639_3 = clean_data
+    _index(clean_data)
     return len(clean_data)
@@ -1,4 +1,4 @@
-from typing import Any, List
+from typing import Any, Callable, Optional, Sequence
 
 import discord
 from discord.ext import commands
@@ -45,13 +45,26 @@ class ConfirmView(BaseView):
 
 
 class ViewPages(BaseView):
-    def __init__(self, ctx: commands.Context, items: List[Any], timeout: int = 180):
+    def __init__(
+        self,
+        ctx: commands.Context,
+        items: Sequence[Any],
+        timeout: int = 180,
+        page_factory: Optional[Callable[[Any], discord.Embed | str]] = None,
+    ):
         super().__init__(ctx=ctx, timeout=timeout)
         self.items = items
+        self.page_factory = page_factory
         self.current_page = 0
         self.pages = len(self.items)
         self.use_last_and_first = self.pages > 2
 
+    def get_page(self, index: int) -> discord.Embed | str:
+        item = self.items[index]
+        if self.page_factory:
+            return self.page_factory(item)
+        return item
+
     def get_kwargs(self, item: discord.Embed | str):
         if isinstance(item, discord.Embed):
             return {"embed": item}
@@ -59,7 +72,7 @@ class ViewPages(BaseView):
             return {"content": item}
 
     async def start(self):
-        start_page = self.items[0]
+        start_page = self.get_page(0)
         kwargs = self.get_kwargs(start_page)
 
         if self.pages == 1:
@@ -72,7 +85,7 @@ class ViewPages(BaseView):
         self.message = await self.ctx.send(**kwargs, view=self)
 
     async def update_view(self, interaction: discord.Interaction):
-        item = self.items[self.current_page]
+        item = self.get_page(self.current_page)
         kwargs = self.get_kwargs(item)
         self.update_labels()
 
@@ -0,0 +1,30 @@
+import pytest
+
+from artemis.utils.iso_639 import get_language_code, iso_639_3
+
+pytestmark = pytest.mark.skipif(not iso_639_3, reason="data/iso_639_3.json not available")
+
+
+def names(query: str) -> list[str]:
+    return [entry["name"] for entry in get_language_code(query) or []]
+
+
+@pytest.mark.parametrize("query", ["deutsch", "serbo", "german"])
+def test_fuzzy_skips_single_letter_names(query):
+    found = names(query)
+    assert "E" not in found
+    assert "U" not in found
+
+
+def test_fuzzy_finds_partial_name():
+    assert "Unserdeutsch" in names("deutsch")
+
+
+def test_exact_name_keeps_variants():
+    found = names("English")
+    assert found[0] == "English"
+    assert len(found) > 1
+
+
+def test_exact_lookup_still_finds_short_names():
+    assert names("e")[0] == "E"